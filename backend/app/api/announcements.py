@@ -2,12 +2,11 @@
 FixMyCondo - Announcements API Routes
 Building announcements and notifications
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, insert, update, and_, func, tuple_
 from typing import Optional, List
 from datetime import datetime
-import json
 
 from ..database import get_db
 from ..models import Announcement, Building, User, UserRole
@@ -15,7 +14,10 @@ from ..schemas import (
     AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse,
     PaginatedResponse
 )
-from ..services import get_current_user, require_admin, require_committee
+from ..services import (
+    get_current_user, require_admin, require_committee,
+    cache_get, cache_set, cache_delete, encode_cursor, decode_cursor, cached_count, etag_response
+)
 
 router = APIRouter(prefix="/announcements", tags=["Announcements"])
 
@@ -39,21 +41,19 @@ async def create_announcement(
             detail="Building not found"
         )
     
-    announcement = Announcement(
+    result = await db.execute(insert(Announcement).values(
         building_id=announcement_data.building_id,
         title=announcement_data.title,
         content=announcement_data.content,
-        target_audience=json.dumps(announcement_data.target_audience) if announcement_data.target_audience else None,
-        attachments=json.dumps(announcement_data.attachments) if announcement_data.attachments else None,
+        target_audience=announcement_data.target_audience or None,
+        attachments=announcement_data.attachments or None,
         send_push=announcement_data.send_push,
         send_email=announcement_data.send_email,
         send_whatsapp=announcement_data.send_whatsapp,
         is_published=False
-    )
-    
-    db.add(announcement)
+    ).returning(Announcement))
+    announcement = result.scalar_one()
     await db.commit()
-    await db.refresh(announcement)
     
     return _serialize_announcement(announcement)
 
@@ -64,6 +64,7 @@ async def get_announcements(
     page_size: int = Query(20, ge=1, le=100),
     building_id: Optional[int] = None,
     is_published: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor; overrides page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -72,13 +73,11 @@ async def get_announcements(
     filters = []
     
     # Role-based filtering
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role != UserRole.SUPER_ADMIN:
+    if current_user.role != UserRole.SUPER_ADMIN:
         if current_user.building_id:
             filters.append(Announcement.building_id == current_user.building_id)
         # Residents only see published announcements
-        if user_role == UserRole.RESIDENT:
+        if current_user.role == UserRole.RESIDENT:
             filters.append(Announcement.is_published == True)
     elif building_id:
         filters.append(Announcement.building_id == building_id)
@@ -89,61 +88,86 @@ async def get_announcements(
     if filters:
         query = query.where(and_(*filters))
     
-    query = query.order_by(Announcement.created_at.desc())
+    query = query.order_by(Announcement.created_at.desc(), Announcement.id.desc())
     
-    # Get total count
     count_query = select(func.count(Announcement.id))
     if filters:
         count_query = count_query.where(and_(*filters))
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
     
-    # Apply pagination
+    # Apply pagination: keyset when a cursor is given, offset otherwise,
+    # with one extra row to tell whether this is the last page
     offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor, datetime, int)
+        query = query.where(
+            tuple_(Announcement.created_at, Announcement.id) < (cursor_created_at, cursor_id)
+        )
+    else:
+        query = query.offset(offset)
+    query = query.limit(page_size + 1)
     
     result = await db.execute(query)
     announcements = result.scalars().all()
+    has_next = len(announcements) > page_size
+    announcements = announcements[:page_size]
+    
+    # On the last offset page the total follows from the offset; only count otherwise
+    if cursor or has_next or (offset and not announcements):
+        total = await cached_count(db, "announcements:count", count_query)
+    else:
+        total = offset + len(announcements)
     
-    items = [_serialize_announcement(a) for a in announcements]
+    items = [_serialize_announcement(announcement) for announcement in announcements]
+    
+    next_cursor = None
+    if has_next:
+        last = announcements[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
     
     return PaginatedResponse(
         items=items,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
+        total_pages=(total + page_size - 1) // page_size,
+        has_next=has_next,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{announcement_id}", response_model=AnnouncementResponse)
 async def get_announcement(
     announcement_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific announcement"""
-    result = await db.execute(
-        select(Announcement).where(Announcement.id == announcement_id)
-    )
-    announcement = result.scalar_one_or_none()
-    
-    if not announcement:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Announcement not found"
-        )
+    cache_key = f"announcement:{announcement_id}"
+    body = await cache_get(cache_key)
+    if body:
+        response = AnnouncementResponse.model_validate_json(body)
+    else:
+        announcement = await db.get(Announcement, announcement_id)
+        
+        if not announcement:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Announcement not found"
+            )
+        
+        response = _serialize_announcement(announcement)
+        body = response.model_dump_json()
+        await cache_set(cache_key, body)
     
     # Check access for residents
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role == UserRole.RESIDENT and not announcement.is_published:
+    if current_user.role == UserRole.RESIDENT and not response.is_published:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
     
-    return _serialize_announcement(announcement)
+    return etag_response(request, body)
 
 
 @router.patch("/{announcement_id}", response_model=AnnouncementResponse)
@@ -154,29 +178,25 @@ async def update_announcement(
     current_user: User = Depends(require_committee)
 ):
     """Update an announcement"""
-    result = await db.execute(
-        select(Announcement).where(Announcement.id == announcement_id)
-    )
-    announcement = result.scalar_one_or_none()
-    
-    if not announcement:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Announcement not found"
-        )
+    announcement = await _get_managed_announcement(db, announcement_id, current_user)
     
     update_dict = update_data.model_dump(exclude_unset=True)
     
-    for field, value in update_dict.items():
-        setattr(announcement, field, value)
-    
     # Set published_at if publishing
     if update_data.is_published and not announcement.published_at:
-        announcement.published_at = datetime.utcnow()
+        update_dict["published_at"] = datetime.utcnow()
     
-    announcement.updated_at = datetime.utcnow()
+    # Expire the loaded row so RETURNING repopulates it
+    db.expire(announcement)
+    result = await db.execute(
+        update(Announcement)
+        .where(Announcement.id == announcement_id)
+        .values(**update_dict)
+        .returning(Announcement)
+    )
+    announcement = result.scalar_one()
     await db.commit()
-    await db.refresh(announcement)
+    await cache_delete(f"announcement:{announcement_id}")
     
     return _serialize_announcement(announcement)
 
@@ -188,16 +208,7 @@ async def publish_announcement(
     current_user: User = Depends(require_committee)
 ):
     """Publish an announcement"""
-    result = await db.execute(
-        select(Announcement).where(Announcement.id == announcement_id)
-    )
-    announcement = result.scalar_one_or_none()
-    
-    if not announcement:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Announcement not found"
-        )
+    announcement = await _get_managed_announcement(db, announcement_id, current_user)
     
     if announcement.is_published:
         raise HTTPException(
@@ -205,14 +216,21 @@ async def publish_announcement(
             detail="Announcement is already published"
         )
     
-    announcement.is_published = True
-    announcement.published_at = datetime.utcnow()
+    # Expire the loaded row so RETURNING repopulates it
+    db.expire(announcement)
+    result = await db.execute(
+        update(Announcement)
+        .where(Announcement.id == announcement_id)
+        .values(is_published=True, published_at=datetime.utcnow())
+        .returning(Announcement)
+    )
+    announcement = result.scalar_one()
     
     # TODO: Trigger notifications based on send_push, send_email, send_whatsapp
     # This would integrate with Redis queue for async processing
     
     await db.commit()
-    await db.refresh(announcement)
+    await cache_delete(f"announcement:{announcement_id}")
     
     return _serialize_announcement(announcement)
 
@@ -224,10 +242,28 @@ async def delete_announcement(
     current_user: User = Depends(require_admin)
 ):
     """Delete an announcement (admin only)"""
-    result = await db.execute(
-        select(Announcement).where(Announcement.id == announcement_id)
-    )
-    announcement = result.scalar_one_or_none()
+    announcement = await _get_managed_announcement(db, announcement_id, current_user)
+    
+    await db.delete(announcement)
+    await db.commit()
+    await cache_delete(f"announcement:{announcement_id}")
+
+
+async def _get_managed_announcement(
+    db: AsyncSession,
+    announcement_id: int,
+    current_user: User
+) -> Announcement:
+    """Load an announcement the current user may manage (scoped to their building)"""
+    announcement = await db.get(Announcement, announcement_id)
+    
+    if (
+        announcement
+        and current_user.role != UserRole.SUPER_ADMIN
+        and current_user.building_id
+        and announcement.building_id != current_user.building_id
+    ):
+        announcement = None
     
     if not announcement:
         raise HTTPException(
@@ -235,19 +271,18 @@ async def delete_announcement(
             detail="Announcement not found"
         )
     
-    await db.delete(announcement)
-    await db.commit()
+    return announcement
 
 
 def _serialize_announcement(announcement: Announcement) -> AnnouncementResponse:
-    """Helper to serialize announcement"""
-    return AnnouncementResponse(
+    """Helper to serialize announcement (rows come from the database, so validation is skipped)"""
+    return AnnouncementResponse.model_construct(
         id=announcement.id,
         building_id=announcement.building_id,
         title=announcement.title,
         content=announcement.content,
-        target_audience=json.loads(announcement.target_audience) if announcement.target_audience else None,
-        attachments=json.loads(announcement.attachments) if announcement.attachments else None,
+        target_audience=announcement.target_audience or None,
+        attachments=announcement.attachments or None,
         is_published=announcement.is_published,
         published_at=announcement.published_at,
         created_at=announcement.created_at
@@ -2,26 +2,62 @@
 FixMyCondo - Authentication API Routes
 Login, Register, Token Refresh
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, bindparam
 from datetime import datetime
 
 from ..database import get_db
-from ..models import User, UserRole
+from ..models import User, UserRole, Building, Unit
 from ..schemas import (
     TokenSchema, LoginRequest, RegisterRequest, 
     UserResponse, UserCreate, UserUpdate, PasswordChange,
     ResidenceResponse
 )
 from ..services import (
-    hash_password, verify_password, create_tokens,
-    decode_token, get_current_user
+    hash_password, verify_password, verify_and_update_password, create_tokens,
+    decode_token, get_current_user, invalidate_user, etag_response
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Prebuilt statements for hot user lookups (compiled once, parameters bound per call)
+_USER_BY_EMAIL_STMT = select(User).where(User.email == bindparam("email"))
+
+
+async def _authenticate(db: AsyncSession, email: str, password: str) -> User:
+    """Verify the credentials, then stamp last_login in a short write transaction"""
+    result = await db.execute(_USER_BY_EMAIL_STMT, {"email": email})
+    user = result.scalar_one_or_none()
+    # End the read before the slow bcrypt verify so no lock is held across it
+    await db.commit()
+    
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is disabled"
+        )
+    
+    user.last_login = datetime.utcnow()
+    # Bring hashes made with a different BCRYPT_ROUNDS up to the current cost
+    if new_hash:
+        user.hashed_password = new_hash
+    
+    await db.commit()
+    await invalidate_user(user.id)
+    return user
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
@@ -30,7 +66,7 @@ async def register(
 ):
     """Register a new user account"""
     # Check if email already exists
-    result = await db.execute(select(User).where(User.email == request.email))
+    result = await db.execute(_USER_BY_EMAIL_STMT, {"email": request.email})
     existing_user = result.scalar_one_or_none()
     
     if existing_user:
@@ -40,19 +76,17 @@ async def register(
         )
     
     # Create new user
-    user = User(
+    result = await db.execute(insert(User).values(
         email=request.email,
-        hashed_password=hash_password(request.password),
+        hashed_password=await hash_password(request.password),
         full_name=request.full_name,
         phone=request.phone,
         role=request.role,
         building_id=request.building_id,
         unit_id=request.unit_id
-    )
-    
-    db.add(user)
+    ).returning(User))
+    user = result.scalar_one()
     await db.commit()
-    await db.refresh(user)
     
     return user
 
@@ -63,26 +97,7 @@ async def login(
     db: AsyncSession = Depends(get_db)
 ):
     """Login with email and password"""
-    # Find user by email
-    result = await db.execute(select(User).where(User.email == request.email))
-    user = result.scalar_one_or_none()
-    
-    if not user or not verify_password(request.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account is disabled"
-        )
-    
-    # Update last login
-    user.last_login = datetime.utcnow()
-    await db.commit()
+    user = await _authenticate(db, request.email, request.password)
     
     # Generate tokens
     return create_tokens(user)
@@ -94,26 +109,8 @@ async def login_form(
     db: AsyncSession = Depends(get_db)
 ):
     """Login using OAuth2 password form (for Swagger UI)"""
-    # Find user by email (username field)
-    result = await db.execute(select(User).where(User.email == form_data.username))
-    user = result.scalar_one_or_none()
-    
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account is disabled"
-        )
-    
-    # Update last login
-    user.last_login = datetime.utcnow()
-    await db.commit()
+    # Email is passed in the username field
+    user = await _authenticate(db, form_data.username, form_data.password)
     
     return create_tokens(user)
 
@@ -133,8 +130,7 @@ async def refresh_token(
         )
     
     # Verify user still exists and is active
-    result = await db.execute(select(User).where(User.id == payload.sub))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, payload.sub)
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -147,10 +143,11 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Get current authenticated user information"""
-    return current_user
+    return etag_response(request, UserResponse.model_validate(current_user).model_dump_json())
 
 
 @router.patch("/profile", response_model=UserResponse)
@@ -162,21 +159,41 @@ async def update_profile(
     """Update current user profile"""
     # Restrict what users can update
     # Users cannot update their role or active status via this endpoint
+    changes = {}
     if update_data.full_name is not None:
-        current_user.full_name = update_data.full_name
+        changes["full_name"] = update_data.full_name
     if update_data.phone is not None:
-        current_user.phone = update_data.phone
+        changes["phone"] = update_data.phone
     
     # Technician speciality
     if update_data.speciality is not None and current_user.role == UserRole.TECHNICIAN:
-        current_user.speciality = update_data.speciality
+        changes["speciality"] = update_data.speciality
     
     if update_data.settings is not None:
-        current_user.settings = update_data.settings
-        
+        changes["settings"] = update_data.settings
+        # The app stores its push toggle in settings; keep the column in step
+        if "pushEnabled" in update_data.settings:
+            changes["notifications_enabled"] = bool(update_data.settings["pushEnabled"])
+    
+    # Preferences kept as columns
+    for field in ("locale", "timezone", "notifications_enabled", "push_token"):
+        value = getattr(update_data, field)
+        if value is not None:
+            changes[field] = value
+    
+    if not changes:
+        return current_user
+    
+    # Expire the loaded row so RETURNING repopulates it
+    user_id = current_user.id
+    db.expire(current_user)
+    result = await db.execute(
+        update(User).where(User.id == user_id).values(**changes).returning(User)
+    )
+    user = result.scalar_one()
     await db.commit()
-    await db.refresh(current_user)
-    return current_user
+    await invalidate_user(user.id)
+    return user
 
 
 @router.post("/password")
@@ -186,14 +203,18 @@ async def change_password(
     current_user: User = Depends(get_current_user)
 ):
     """Change current user password"""
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    # Cached users do not carry the password hash, so load it explicitly
+    await db.refresh(current_user, ["hashed_password"])
+    
+    if not await verify_password(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
-    current_user.hashed_password = hash_password(password_data.new_password)
+    current_user.hashed_password = await hash_password(password_data.new_password)
     await db.commit()
+    await invalidate_user(current_user.id)
     
     return {"message": "Password updated successfully"}
 
@@ -210,6 +231,7 @@ async def logout(
 
 @router.get("/residence", response_model=ResidenceResponse)
 async def get_my_residence(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -220,21 +242,26 @@ async def get_my_residence(
             detail="User is not associated with any building or unit"
         )
     
-    # Fetch building and unit
-    from ..models import Building, Unit
-    building_result = await db.execute(select(Building).where(Building.id == current_user.building_id))
-    building = building_result.scalar_one_or_none()
-    
-    unit_result = await db.execute(select(Unit).where(Unit.id == current_user.unit_id))
-    unit = unit_result.scalar_one_or_none()
+    # Fetch building and unit in one round-trip
+    result = await db.execute(
+        select(Building, Unit)
+        .join(Unit, Unit.building_id == Building.id)
+        .where(
+            Building.id == current_user.building_id,
+            Unit.id == current_user.unit_id
+        )
+    )
+    row = result.one_or_none()
     
-    if not building or not unit:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Building or Unit record missing"
         )
     
-    return ResidenceResponse(
+    building, unit = row
+    
+    residence = ResidenceResponse(
         building_name=building.name,
         building_address=building.address,
         unit_number=unit.unit_number,
@@ -245,3 +272,5 @@ async def get_my_residence(
         building_manager=building.manager_name,
         manager_phone=building.manager_phone
     )
+    
+    return etag_response(request, residence.model_dump_json())
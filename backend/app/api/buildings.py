@@ -2,9 +2,9 @@
 FixMyCondo - Buildings API Routes
 Building and Unit management
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, update, case, func, tuple_
 from sqlalchemy.orm import selectinload
 from typing import Optional, List
 
@@ -15,10 +15,16 @@ from ..schemas import (
     UnitCreate, UnitUpdate, UnitResponse,
     PaginatedResponse
 )
-from ..services import get_current_user, require_admin
+from ..services import (
+    get_current_user, require_admin,
+    cache_get, cache_set, cache_delete, encode_cursor, decode_cursor, cached_count, etag_response
+)
 
 router = APIRouter(prefix="/buildings", tags=["Buildings"])
 
+# Columns backing BuildingResponse, selected directly for list pages
+_BUILDING_LIST_COLUMNS = tuple(getattr(Building, field) for field in BuildingResponse.model_fields)
+
 
 # ============================================
 # BUILDING ENDPOINTS
@@ -31,10 +37,11 @@ async def create_building(
     current_user: User = Depends(require_admin)
 ):
     """Create a new building (admin only)"""
-    building = Building(**building_data.model_dump())
-    db.add(building)
+    result = await db.execute(
+        insert(Building).values(**building_data.model_dump()).returning(Building)
+    )
+    building = result.scalar_one()
     await db.commit()
-    await db.refresh(building)
     return building
 
 
@@ -45,17 +52,16 @@ async def get_buildings(
     search: Optional[str] = None,
     city: Optional[str] = None,
     is_active: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor; overrides page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of buildings with filtering"""
-    query = select(Building)
+    query = select(*_BUILDING_LIST_COLUMNS)
     filters = []
     
     # Role-based filtering
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role != UserRole.SUPER_ADMIN and current_user.building_id:
+    if current_user.role != UserRole.SUPER_ADMIN and current_user.building_id:
         filters.append(Building.id == current_user.building_id)
     
     if search:
@@ -69,66 +75,76 @@ async def get_buildings(
         from sqlalchemy import and_
         query = query.where(and_(*filters))
     
-    # Get total count
-    count_result = await db.execute(select(func.count(Building.id)).where(*filters) if filters else select(func.count(Building.id)))
-    total = count_result.scalar()
+    count_query = select(func.count(Building.id))
+    if filters:
+        count_query = count_query.where(*filters)
     
-    # Apply pagination
+    # Apply pagination: keyset when a cursor is given, offset otherwise,
+    # with one extra row to tell whether this is the last page
     offset = (page - 1) * page_size
-    query = query.order_by(Building.name).offset(offset).limit(page_size)
+    query = query.order_by(Building.name, Building.id)
+    if cursor:
+        cursor_name, cursor_id = decode_cursor(cursor, str, int)
+        query = query.where(tuple_(Building.name, Building.id) > (cursor_name, cursor_id))
+    else:
+        query = query.offset(offset)
+    query = query.limit(page_size + 1)
     
     result = await db.execute(query)
-    buildings = result.scalars().all()
+    rows = result.all()
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    # On the last offset page the total follows from the offset; only count otherwise
+    if cursor or has_next or (offset and not rows):
+        total = await cached_count(db, "buildings:count", count_query)
+    else:
+        total = offset + len(rows)
     
+    # Rows come straight from the database, so skip per-item validation
     items = [
-        BuildingResponse(
-            id=b.id,
-            name=b.name,
-            address=b.address,
-            city=b.city,
-            state=b.state,
-            postal_code=b.postal_code,
-            country=b.country,
-            total_blocks=b.total_blocks,
-            total_units=b.total_units,
-            manager_name=b.manager_name,
-            manager_email=b.manager_email,
-            manager_phone=b.manager_phone,
-            subscription_tier=b.subscription_tier,
-            is_active=b.is_active,
-            created_at=b.created_at
-        )
-        for b in buildings
+        BuildingResponse.model_construct(**{field: row._mapping[field] for field in BuildingResponse.model_fields})
+        for row in rows
     ]
     
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(rows[-1].name, rows[-1].id)
+    
     return PaginatedResponse(
         items=items,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
+        total_pages=(total + page_size - 1) // page_size,
+        has_next=has_next,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{building_id}", response_model=BuildingResponse)
 async def get_building(
     building_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific building by ID"""
-    result = await db.execute(
-        select(Building).where(Building.id == building_id)
-    )
-    building = result.scalar_one_or_none()
-    
-    if not building:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Building not found"
-        )
-    
-    return building
+    cache_key = f"building:{building_id}"
+    body = await cache_get(cache_key)
+    if not body:
+        building = await db.get(Building, building_id)
+        
+        if not building:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Building not found"
+            )
+        
+        body = BuildingResponse.model_validate(building).model_dump_json()
+        await cache_set(cache_key, body)
+    
+    return etag_response(request, body)
 
 
 @router.patch("/{building_id}", response_model=BuildingResponse)
@@ -139,10 +155,14 @@ async def update_building(
     current_user: User = Depends(require_admin)
 ):
     """Update a building (admin only)"""
-    result = await db.execute(
-        select(Building).where(Building.id == building_id)
-    )
-    building = result.scalar_one_or_none()
+    update_dict = update_data.model_dump(exclude_unset=True)
+    if update_dict:
+        result = await db.execute(
+            update(Building).where(Building.id == building_id).values(**update_dict).returning(Building)
+        )
+        building = result.scalar_one_or_none()
+    else:
+        building = await db.get(Building, building_id)
     
     if not building:
         raise HTTPException(
@@ -150,12 +170,8 @@ async def update_building(
             detail="Building not found"
         )
     
-    update_dict = update_data.model_dump(exclude_unset=True)
-    for field, value in update_dict.items():
-        setattr(building, field, value)
-    
     await db.commit()
-    await db.refresh(building)
+    await cache_delete(f"building:{building_id}")
     return building
 
 
@@ -166,10 +182,7 @@ async def delete_building(
     current_user: User = Depends(require_admin)
 ):
     """Delete a building (admin only)"""
-    result = await db.execute(
-        select(Building).where(Building.id == building_id)
-    )
-    building = result.scalar_one_or_none()
+    building = await db.get(Building, building_id)
     
     if not building:
         raise HTTPException(
@@ -179,6 +192,7 @@ async def delete_building(
     
     await db.delete(building)
     await db.commit()
+    await cache_delete(f"building:{building_id}")
 
 
 # ============================================
@@ -193,26 +207,29 @@ async def create_unit(
     current_user: User = Depends(require_admin)
 ):
     """Create a new unit in a building"""
-    # Verify building exists
+    # Bump the building unit count in place; no row updated means no building
     result = await db.execute(
-        select(Building).where(Building.id == building_id)
+        update(Building)
+        .where(Building.id == building_id)
+        .values(total_units=Building.total_units + 1)
+        .returning(Building.id)
     )
-    building = result.scalar_one_or_none()
     
-    if not building:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Building not found"
         )
     
-    unit = Unit(building_id=building_id, **unit_data.model_dump(exclude={'building_id'}))
-    db.add(unit)
-    
-    # Update building unit count
-    building.total_units += 1
+    result = await db.execute(
+        insert(Unit)
+        .values(building_id=building_id, **unit_data.model_dump(exclude={'building_id'}))
+        .returning(Unit)
+    )
+    unit = result.scalar_one()
     
     await db.commit()
-    await db.refresh(unit)
+    await cache_delete(f"building:{building_id}")
     return unit
 
 
@@ -246,22 +263,26 @@ async def get_building_units(
 @router.get("/units/{unit_id}", response_model=UnitResponse)
 async def get_unit(
     unit_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific unit by ID"""
-    result = await db.execute(
-        select(Unit).where(Unit.id == unit_id)
-    )
-    unit = result.scalar_one_or_none()
-    
-    if not unit:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Unit not found"
-        )
-    
-    return unit
+    cache_key = f"unit:{unit_id}"
+    body = await cache_get(cache_key)
+    if not body:
+        unit = await db.get(Unit, unit_id)
+        
+        if not unit:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Unit not found"
+            )
+        
+        body = UnitResponse.model_validate(unit).model_dump_json()
+        await cache_set(cache_key, body)
+    
+    return etag_response(request, body)
 
 
 @router.patch("/units/{unit_id}", response_model=UnitResponse)
@@ -272,10 +293,14 @@ async def update_unit(
     current_user: User = Depends(require_admin)
 ):
     """Update a unit (admin only)"""
-    result = await db.execute(
-        select(Unit).where(Unit.id == unit_id)
-    )
-    unit = result.scalar_one_or_none()
+    update_dict = update_data.model_dump(exclude_unset=True)
+    if update_dict:
+        result = await db.execute(
+            update(Unit).where(Unit.id == unit_id).values(**update_dict).returning(Unit)
+        )
+        unit = result.scalar_one_or_none()
+    else:
+        unit = await db.get(Unit, unit_id)
     
     if not unit:
         raise HTTPException(
@@ -283,12 +308,8 @@ async def update_unit(
             detail="Unit not found"
         )
     
-    update_dict = update_data.model_dump(exclude_unset=True)
-    for field, value in update_dict.items():
-        setattr(unit, field, value)
-    
     await db.commit()
-    await db.refresh(unit)
+    await cache_delete(f"unit:{unit_id}")
     return unit
 
 
@@ -299,10 +320,7 @@ async def delete_unit(
     current_user: User = Depends(require_admin)
 ):
     """Delete a unit (admin only)"""
-    result = await db.execute(
-        select(Unit).where(Unit.id == unit_id)
-    )
-    unit = result.scalar_one_or_none()
+    unit = await db.get(Unit, unit_id)
     
     if not unit:
         raise HTTPException(
@@ -310,13 +328,13 @@ async def delete_unit(
             detail="Unit not found"
         )
     
-    # Update building unit count
-    building_result = await db.execute(
-        select(Building).where(Building.id == unit.building_id)
+    # Update building unit count in place, never going below zero
+    await db.execute(
+        update(Building)
+        .where(Building.id == unit.building_id)
+        .values(total_units=case((Building.total_units > 0, Building.total_units - 1), else_=0))
     )
-    building = building_result.scalar_one_or_none()
-    if building:
-        building.total_units = max(0, building.total_units - 1)
     
     await db.delete(unit)
     await db.commit()
+    await cache_delete(f"unit:{unit_id}", f"building:{unit.building_id}")
@@ -2,13 +2,14 @@
 FixMyCondo - Complaints API Routes
 Full CRUD operations for complaints with SLA tracking
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, and_, or_, func, tuple_
+from sqlalchemy.orm import selectinload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import Optional, List
 from datetime import datetime
-import json
+import asyncio
 
 from ..database import get_db
 from ..models import (
@@ -16,13 +17,15 @@ from ..models import (
     ComplaintStatus, ComplaintPriority, ComplaintCategory, UserRole
 )
 from ..schemas import (
-    ComplaintCreate, ComplaintUpdate, ComplaintResponse, ComplaintListResponse,
+    ComplaintCreate, ComplaintUpdate, ComplaintResponse, ComplaintListResponse, COMPLAINT_LIST_ADAPTER,
     ComplaintUpdateCreate, ComplaintUpdateResponse,
     PaginatedResponse, UserResponse
 )
 from ..services import (
     get_current_user, require_admin, require_committee,
-    calculate_sla_deadline, get_sla_hours, get_sla_status
+    get_sla_hours, get_sla_status,
+    encode_cursor, decode_cursor, cached_count,
+    invalidate_dashboard_cache, schedule_dashboard_refresh
 )
 
 router = APIRouter(prefix="/complaints", tags=["Complaints"])
@@ -52,7 +55,6 @@ async def create_complaint(
     
     # Calculate SLA
     sla_hours = get_sla_hours(complaint_data.priority)
-    sla_deadline = calculate_sla_deadline(datetime.utcnow(), complaint_data.priority)
     
     # Create complaint
     complaint = Complaint(
@@ -65,25 +67,18 @@ async def create_complaint(
         status=ComplaintStatus.SUBMITTED,
         created_by_id=current_user.id,
         sla_hours=sla_hours,
-        sla_deadline=sla_deadline,
         preferred_visit_time=complaint_data.preferred_visit_time,
         allow_technician_entry=complaint_data.allow_technician_entry,
-        photos=json.dumps(complaint_data.photos) if complaint_data.photos else None,
-        videos=json.dumps(complaint_data.videos) if complaint_data.videos else None
+        photos=complaint_data.photos or None,
+        videos=complaint_data.videos or None
     )
     
     db.add(complaint)
     await db.commit()
-    await db.refresh(complaint)
-    
-    # Load relationships
-    result = await db.execute(
-        select(Complaint)
-        .options(selectinload(Complaint.created_by), selectinload(Complaint.assigned_to))
-        .where(Complaint.id == complaint.id)
-    )
-    complaint = result.scalar_one()
+    await invalidate_dashboard_cache(building_id)
+    schedule_dashboard_refresh()
     
+    await _attach_people(db, complaint, current_user)
     return _serialize_complaint(complaint)
 
 
@@ -99,26 +94,33 @@ async def get_complaints(
     created_by_me: bool = False,
     is_overdue: Optional[bool] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor; overrides page"),
+    include_total: bool = Query(False, description="Also return total and total_pages (runs a cached COUNT)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of complaints with filtering and pagination"""
-    query = select(Complaint).options(
-        selectinload(Complaint.created_by),
-        selectinload(Complaint.assigned_to),
-        selectinload(Complaint.unit)
-    )
+    # Only the ComplaintListResponse columns, so no entities or relationship loads
+    query = select(
+        Complaint.id,
+        Complaint.title,
+        Complaint.category,
+        Complaint.priority,
+        Complaint.status,
+        Unit.unit_number,
+        Complaint.sla_deadline,
+        Complaint.is_sla_breached.label("is_sla_breached"),
+        Complaint.created_at
+    ).outerjoin(Unit, Complaint.unit_id == Unit.id)
     
     # Apply filters
     filters = []
     
     # Role-based filtering
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role == UserRole.RESIDENT:
+    if current_user.role == UserRole.RESIDENT:
         # Residents can only see their own complaints
         filters.append(Complaint.created_by_id == current_user.id)
-    elif user_role == UserRole.TECHNICIAN:
+    elif current_user.role == UserRole.TECHNICIAN:
         # Technicians see assigned complaints or all if admin
         if assigned_to_me:
             filters.append(Complaint.assigned_to_id == current_user.id)
@@ -133,7 +135,7 @@ async def get_complaints(
         filters.append(Complaint.category == category)
     if priority:
         filters.append(Complaint.priority == priority)
-    if building_id and user_role == UserRole.SUPER_ADMIN:
+    if building_id and current_user.role == UserRole.SUPER_ADMIN:
         filters.append(Complaint.building_id == building_id)
     if created_by_me:
         filters.append(Complaint.created_by_id == current_user.id)
@@ -150,45 +152,54 @@ async def get_complaints(
     if filters:
         query = query.where(and_(*filters))
     
-    # Order by latest first
-    query = query.order_by(Complaint.created_at.desc())
+    # Order by latest first (id breaks ties for stable keyset pages)
+    query = query.order_by(Complaint.created_at.desc(), Complaint.id.desc())
     
-    # Get total count
-    count_query = select(func.count(Complaint.id))
-    if filters:
-        count_query = count_query.where(and_(*filters))
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    result = await db.execute(query)
-    complaints = result.scalars().all()
-    
-    # Serialize items
-    items = []
-    for complaint in complaints:
-        items.append({
-            "id": complaint.id,
-            "title": complaint.title,
-            "category": complaint.category.value if complaint.category else None,
-            "priority": complaint.priority.value if complaint.priority else None,
-            "status": complaint.status.value if complaint.status else None,
-            "unit_number": complaint.unit.unit_number if complaint.unit else None,
-            "sla_deadline": complaint.sla_deadline.isoformat() if complaint.sla_deadline else None,
-            "is_sla_breached": complaint.is_sla_breached,
-            "created_at": complaint.created_at.isoformat()
-        })
-    
-    return PaginatedResponse(
+    # Apply pagination: keyset when a cursor is given, offset otherwise
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor, datetime, int)
+        query = query.where(
+            tuple_(Complaint.created_at, Complaint.id) < (cursor_created_at, cursor_id)
+        )
+    else:
+        query = query.offset((page - 1) * page_size)
+    # One extra row tells us whether a next page exists without counting
+    query = query.limit(page_size + 1)
+    
+    # Total count only on request, on a second session concurrently with the page query
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(Complaint)
+        if filters:
+            count_query = count_query.where(and_(*filters))
+        result, total = await asyncio.gather(
+            db.execute(query), cached_count(None, "complaints:count", count_query)
+        )
+    else:
+        result = await db.execute(query)
+    
+    rows = result.all()
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    items = COMPLAINT_LIST_ADAPTER.validate_python(rows, from_attributes=True)
+    
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    page_response = PaginatedResponse(
         items=items,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
+        total_pages=(total + page_size - 1) // page_size if total is not None else None,
+        has_next=has_next,
+        next_cursor=next_cursor
     )
+    # Encoded straight to JSON bytes by pydantic-core, skipping FastAPI's
+    # second validation and encoding pass over the items
+    return Response(content=page_response.model_dump_json(), media_type="application/json")
 
 
 @router.get("/{complaint_id}", response_model=ComplaintResponse)
@@ -198,16 +209,16 @@ async def get_complaint(
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific complaint by ID"""
-    result = await db.execute(
-        select(Complaint)
-        .options(
+    complaint = await db.get(
+        Complaint,
+        complaint_id,
+        options=[
             selectinload(Complaint.created_by),
             selectinload(Complaint.assigned_to),
-            selectinload(Complaint.updates).selectinload(ComplaintUpdateModel.created_by)
-        )
-        .where(Complaint.id == complaint_id)
+            selectinload(Complaint.updates).selectinload(ComplaintUpdateModel.created_by),
+            raiseload("*")
+        ]
     )
-    complaint = result.scalar_one_or_none()
     
     if not complaint:
         raise HTTPException(
@@ -216,9 +227,7 @@ async def get_complaint(
         )
     
     # Check access permissions
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role == UserRole.RESIDENT and complaint.created_by_id != current_user.id:
+    if current_user.role == UserRole.RESIDENT and complaint.created_by_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
@@ -235,10 +244,7 @@ async def update_complaint(
     current_user: User = Depends(get_current_user)
 ):
     """Update a complaint (status, assignment, etc.)"""
-    result = await db.execute(
-        select(Complaint).where(Complaint.id == complaint_id)
-    )
-    complaint = result.scalar_one_or_none()
+    complaint = await db.get(Complaint, complaint_id)
     
     if not complaint:
         raise HTTPException(
@@ -257,25 +263,15 @@ async def update_complaint(
         if update_data.status in [ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED]:
             complaint.resolved_at = datetime.utcnow()
     
-    # Recalculate SLA if priority changes
+    # Recalculate SLA if priority changes (the deadline is regenerated from sla_hours)
     if update_data.priority:
         complaint.sla_hours = get_sla_hours(update_data.priority)
-        complaint.sla_deadline = calculate_sla_deadline(
-            complaint.created_at, update_data.priority
-        )
     
-    complaint.updated_at = datetime.utcnow()
     await db.commit()
-    await db.refresh(complaint)
-    
-    # Reload with relationships
-    result = await db.execute(
-        select(Complaint)
-        .options(selectinload(Complaint.created_by), selectinload(Complaint.assigned_to))
-        .where(Complaint.id == complaint.id)
-    )
-    complaint = result.scalar_one()
+    await invalidate_dashboard_cache(complaint.building_id)
+    schedule_dashboard_refresh()
     
+    await _attach_people(db, complaint, current_user)
     return _serialize_complaint(complaint)
 
 
@@ -288,10 +284,7 @@ async def add_complaint_update(
 ):
     """Add a timeline update to a complaint"""
     # Verify complaint exists
-    result = await db.execute(
-        select(Complaint).where(Complaint.id == complaint_id)
-    )
-    complaint = result.scalar_one_or_none()
+    complaint = await db.get(Complaint, complaint_id)
     
     if not complaint:
         raise HTTPException(
@@ -306,7 +299,7 @@ async def add_complaint_update(
         message=update_data.message,
         status=update_data.status,
         cost_update=update_data.cost_update,
-        photos=json.dumps(update_data.photos) if update_data.photos else None
+        photos=update_data.photos or None
     )
     
     # Update complaint status if provided
@@ -319,17 +312,19 @@ async def add_complaint_update(
         complaint.actual_cost = (complaint.actual_cost or 0) + update_data.cost_update
     
     db.add(complaint_update)
-    complaint.updated_at = datetime.utcnow()
+    # Both writes go out in one flush; id and created_at are populated by it,
+    # so the response needs no refresh
     await db.commit()
-    await db.refresh(complaint_update)
+    await invalidate_dashboard_cache(complaint.building_id)
+    schedule_dashboard_refresh()
     
     return ComplaintUpdateResponse(
         id=complaint_update.id,
         complaint_id=complaint_update.complaint_id,
         created_by_id=complaint_update.created_by_id,
-        status=complaint_update.status.value if complaint_update.status else None,
+        status=complaint_update.status,
         message=complaint_update.message,
-        photos=json.loads(complaint_update.photos) if complaint_update.photos else None,
+        photos=complaint_update.photos,
         cost_update=complaint_update.cost_update,
         created_at=complaint_update.created_at
     )
@@ -344,7 +339,7 @@ async def get_complaint_updates(
     """Get timeline updates for a complaint"""
     result = await db.execute(
         select(ComplaintUpdateModel)
-        .options(selectinload(ComplaintUpdateModel.created_by))
+        .options(selectinload(ComplaintUpdateModel.created_by), raiseload("*"))
         .where(ComplaintUpdateModel.complaint_id == complaint_id)
         .order_by(ComplaintUpdateModel.created_at.asc())
     )
@@ -355,9 +350,9 @@ async def get_complaint_updates(
             id=u.id,
             complaint_id=u.complaint_id,
             created_by_id=u.created_by_id,
-            status=u.status.value if u.status else None,
+            status=u.status,
             message=u.message,
-            photos=json.loads(u.photos) if u.photos else None,
+            photos=u.photos,
             cost_update=u.cost_update,
             created_at=u.created_at,
             created_by=UserResponse(
@@ -382,10 +377,7 @@ async def delete_complaint(
     current_user: User = Depends(require_admin)
 ):
     """Delete a complaint (admin only)"""
-    result = await db.execute(
-        select(Complaint).where(Complaint.id == complaint_id)
-    )
-    complaint = result.scalar_one_or_none()
+    complaint = await db.get(Complaint, complaint_id)
     
     if not complaint:
         raise HTTPException(
@@ -395,6 +387,24 @@ async def delete_complaint(
     
     await db.delete(complaint)
     await db.commit()
+    await invalidate_dashboard_cache(complaint.building_id)
+    schedule_dashboard_refresh()
+
+
+async def _attach_people(db: AsyncSession, complaint: Complaint, current_user: User) -> None:
+    """Populate created_by/assigned_to in memory instead of re-selecting the complaint"""
+    for attribute, user_id in (
+        ("created_by", complaint.created_by_id),
+        ("assigned_to", complaint.assigned_to_id)
+    ):
+        if user_id is None:
+            user = None
+        elif user_id == current_user.id:
+            user = current_user
+        else:
+            # Identity-map hit when already loaded, otherwise a primary-key SELECT
+            user = await db.get(User, user_id)
+        set_committed_value(complaint, attribute, user)
 
 
 def _serialize_complaint(complaint: Complaint) -> ComplaintResponse:
@@ -410,8 +420,8 @@ def _serialize_complaint(complaint: Complaint) -> ComplaintResponse:
         status=complaint.status,
         created_by_id=complaint.created_by_id,
         assigned_to_id=complaint.assigned_to_id,
-        photos=json.loads(complaint.photos) if complaint.photos else None,
-        videos=json.loads(complaint.videos) if complaint.videos else None,
+        photos=complaint.photos,
+        videos=complaint.videos,
         sla_hours=complaint.sla_hours,
         sla_deadline=complaint.sla_deadline,
         is_sla_breached=complaint.is_sla_breached,
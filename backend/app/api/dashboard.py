@@ -2,20 +2,27 @@
 FixMyCondo - Dashboard API Routes
 Statistics and analytics endpoints
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, case
 from typing import Optional
 from datetime import datetime, timedelta
+import asyncio
 
-from ..database import get_db
+from ..config import settings
+from ..database import (
+    get_db, all_in_new_session, scalar_in_new_session, hours_between
+)
 from ..models import (
-    Complaint, User, Unit, Building, FacilityBooking,
-    ComplaintStatus, ComplaintCategory, ComplaintPriority,
-    BookingStatus, UserRole
+    Complaint, User, Building,
+    ComplaintStatus, ComplaintCategory, ComplaintPriority, UserRole
 )
 from ..schemas import DashboardStats, ComplaintStats
-from ..services import get_current_user, get_sla_compliance_stats
+from ..services import (
+    get_current_user, get_sla_compliance_stats,
+    cache_get, cache_get_or_compute, dashboard_cache_key, compute_dashboard_stats,
+    get_dashboard_generation, cache_set_dashboard
+)
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -28,122 +35,22 @@ async def get_dashboard_stats(
 ):
     """Get dashboard statistics"""
     # Determine building filter
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role != UserRole.SUPER_ADMIN and current_user.building_id:
+    if current_user.role != UserRole.SUPER_ADMIN and current_user.building_id:
         building_id = current_user.building_id
     
-    today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    today_end = datetime.combine(today, datetime.max.time())
-    
-    # Complaint stats
-    complaint_filters = []
-    if building_id:
-        complaint_filters.append(Complaint.building_id == building_id)
-    
-    # Total complaints
-    total_result = await db.execute(
-        select(func.count(Complaint.id)).where(*complaint_filters) if complaint_filters 
-        else select(func.count(Complaint.id))
-    )
-    total_complaints = total_result.scalar() or 0
-    
-    # New complaints (submitted status)
-    new_filters = complaint_filters + [Complaint.status == ComplaintStatus.SUBMITTED]
-    new_result = await db.execute(
-        select(func.count(Complaint.id)).where(and_(*new_filters))
-    )
-    new_complaints = new_result.scalar() or 0
-    
-    # In progress complaints
-    in_progress_statuses = [
-        ComplaintStatus.ASSIGNED,
-        ComplaintStatus.IN_PROGRESS,
-        ComplaintStatus.PENDING_PARTS,
-        ComplaintStatus.PENDING_VENDOR
-    ]
-    progress_filters = complaint_filters + [Complaint.status.in_(in_progress_statuses)]
-    progress_result = await db.execute(
-        select(func.count(Complaint.id)).where(and_(*progress_filters))
-    )
-    in_progress_complaints = progress_result.scalar() or 0
-    
-    # Overdue complaints
-    overdue_filters = complaint_filters + [Complaint.is_sla_breached == True]
-    overdue_result = await db.execute(
-        select(func.count(Complaint.id)).where(and_(*overdue_filters))
-    )
-    overdue_complaints = overdue_result.scalar() or 0
-    
-    # Completed today
-    completed_filters = complaint_filters + [
-        Complaint.status.in_([ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED]),
-        Complaint.resolved_at >= today_start,
-        Complaint.resolved_at <= today_end
-    ]
-    completed_result = await db.execute(
-        select(func.count(Complaint.id)).where(and_(*completed_filters))
-    )
-    completed_today = completed_result.scalar() or 0
-    
-    # Resident/Unit stats
-    unit_filters = []
-    if building_id:
-        unit_filters.append(Unit.building_id == building_id)
-    
-    total_units_result = await db.execute(
-        select(func.count(Unit.id)).where(*unit_filters) if unit_filters 
-        else select(func.count(Unit.id))
-    )
-    total_units = total_units_result.scalar() or 0
-    
-    occupied_filters = unit_filters + [Unit.is_occupied == True]
-    occupied_result = await db.execute(
-        select(func.count(Unit.id)).where(and_(*occupied_filters))
-    )
-    occupied_units = occupied_result.scalar() or 0
-    
-    # Resident count
-    resident_filters = [User.role == UserRole.RESIDENT]
-    if building_id:
-        resident_filters.append(User.building_id == building_id)
-    resident_result = await db.execute(
-        select(func.count(User.id)).where(and_(*resident_filters))
-    )
-    total_residents = resident_result.scalar() or 0
-    
-    # Booking stats
-    pending_bookings_result = await db.execute(
-        select(func.count(FacilityBooking.id)).where(
-            FacilityBooking.status == BookingStatus.PENDING
-        )
-    )
-    pending_bookings = pending_bookings_result.scalar() or 0
-    
-    today_bookings_result = await db.execute(
-        select(func.count(FacilityBooking.id)).where(
-            and_(
-                FacilityBooking.booking_date >= today_start,
-                FacilityBooking.booking_date <= today_end,
-                FacilityBooking.status == BookingStatus.CONFIRMED
-            )
-        )
-    )
-    today_bookings = today_bookings_result.scalar() or 0
-    
-    return DashboardStats(
-        total_complaints=total_complaints,
-        new_complaints=new_complaints,
-        in_progress_complaints=in_progress_complaints,
-        overdue_complaints=overdue_complaints,
-        completed_today=completed_today,
-        total_residents=total_residents,
-        total_units=total_units,
-        occupied_units=occupied_units,
-        pending_bookings=pending_bookings,
-        today_bookings=today_bookings
+    cache_key = dashboard_cache_key(building_id, "stats")
+    cached = await cache_get(cache_key)
+    if cached:
+        return DashboardStats.model_validate_json(cached)
+    
+    # Normally precomputed in the background; computed live on a miss or after a write
+    generation = await get_dashboard_generation(building_id)
+    stats = await compute_dashboard_stats(db, building_id)
+    await cache_set_dashboard(
+        building_id, cache_key, stats.model_dump_json(),
+        ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, generation=generation
     )
+    return stats
 
 
 @router.get("/complaint-stats", response_model=ComplaintStats)
@@ -155,69 +62,67 @@ async def get_complaint_stats(
 ):
     """Get detailed complaint statistics"""
     # Determine building filter
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role != UserRole.SUPER_ADMIN and current_user.building_id:
+    if current_user.role != UserRole.SUPER_ADMIN and current_user.building_id:
         building_id = current_user.building_id
     
+    cache_key = dashboard_cache_key(building_id, "complaint-stats", days)
+    body = await cache_get_or_compute(
+        cache_key,
+        lambda: _complaint_stats_json(db, building_id, days),
+        ttl=settings.COMPLAINT_STATS_CACHE_TTL_SECONDS
+    )
+    return Response(content=body, media_type="application/json")
+
+
+async def _complaint_stats_json(db: AsyncSession, building_id: Optional[int], days: int) -> str:
+    """Aggregate complaint statistics for a building over the last N days, serialized"""
     start_date = datetime.utcnow() - timedelta(days=days)
     
     base_filters = [Complaint.created_at >= start_date]
     if building_id:
         base_filters.append(Complaint.building_id == building_id)
     
-    # Get complaints for analysis
-    result = await db.execute(
-        select(Complaint).where(and_(*base_filters))
+    resolution_query = select(
+        func.avg(hours_between(Complaint.created_at, Complaint.resolved_at))
+    ).where(
+        and_(
+            *base_filters,
+            Complaint.resolved_at.isnot(None),
+            Complaint.status.in_([ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED])
+        )
     )
-    complaints = result.scalars().all()
-    
-    # Analyze by category
-    by_category = {}
-    for cat in ComplaintCategory:
-        count = sum(1 for c in complaints if c.category == cat)
-        if count > 0:
-            by_category[cat.value] = count
-    
-    # Analyze by status
-    by_status = {}
-    for status in ComplaintStatus:
-        count = sum(1 for c in complaints if c.status == status)
-        if count > 0:
-            by_status[status.value] = count
     
-    # Analyze by priority
-    by_priority = {}
-    for priority in ComplaintPriority:
-        count = sum(1 for c in complaints if c.priority == priority)
-        if count > 0:
-            by_priority[priority.value] = count
+    # Histograms and averages are aggregated in SQL, concurrently on separate sessions
+    category_rows, status_rows, priority_rows, avg_resolution_time, sla_stats = await asyncio.gather(
+        all_in_new_session(_count_by(Complaint.category, base_filters)),
+        all_in_new_session(_count_by(Complaint.status, base_filters)),
+        all_in_new_session(_count_by(Complaint.priority, base_filters)),
+        scalar_in_new_session(resolution_query),
+        get_sla_compliance_stats(db, building_id)
+    )
     
-    # Calculate average resolution time
-    resolved_complaints = [
-        c for c in complaints 
-        if c.resolved_at and c.status in [ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED]
-    ]
+    category_counts = dict(category_rows)
+    status_counts = dict(status_rows)
+    priority_counts = dict(priority_rows)
     
-    if resolved_complaints:
-        total_hours = sum(
-            (c.resolved_at - c.created_at).total_seconds() / 3600 
-            for c in resolved_complaints
-        )
-        avg_resolution_time = total_hours / len(resolved_complaints)
-    else:
-        avg_resolution_time = 0.0
+    by_category = {cat.value: category_counts[cat] for cat in ComplaintCategory if category_counts.get(cat)}
+    by_status = {status.value: status_counts[status] for status in ComplaintStatus if status_counts.get(status)}
+    by_priority = {priority.value: priority_counts[priority] for priority in ComplaintPriority if priority_counts.get(priority)}
+    avg_resolution_time = avg_resolution_time or 0.0
     
-    # Get SLA compliance
-    sla_stats = await get_sla_compliance_stats(db, building_id)
-    
-    return ComplaintStats(
+    stats = ComplaintStats(
         by_category=by_category,
         by_status=by_status,
         by_priority=by_priority,
         avg_resolution_time_hours=round(avg_resolution_time, 2),
         sla_compliance_rate=sla_stats["compliance_rate"]
     )
+    return stats.model_dump_json()
+
+
+def _count_by(column, filters: list):
+    """Complaint counts grouped by a column"""
+    return select(column, func.count()).where(and_(*filters)).group_by(column)
 
 
 @router.get("/technician-stats")
@@ -230,57 +135,56 @@ async def get_technician_stats(
     """Get technician performance statistics"""
     start_date = datetime.utcnow() - timedelta(days=days)
     
-    # Get technicians
-    tech_query = select(User).where(User.role == UserRole.TECHNICIAN)
-    if building_id:
-        tech_query = tech_query.where(User.building_id == building_id)
-    
-    tech_result = await db.execute(tech_query)
-    technicians = tech_result.scalars().all()
-    
-    stats = []
-    for tech in technicians:
-        # Get assigned complaints
-        complaint_result = await db.execute(
-            select(Complaint).where(
-                and_(
-                    Complaint.assigned_to_id == tech.id,
-                    Complaint.created_at >= start_date
-                )
+    # One pass over technicians and their recent complaints, aggregated in SQL
+    total_assigned = func.count(Complaint.id)
+    completed = func.count(Complaint.id).filter(
+        Complaint.status.in_([ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED])
+    )
+    tech_query = (
+        select(
+            User.id,
+            User.full_name,
+            User.email,
+            User.speciality,
+            total_assigned.label("total_assigned"),
+            completed.label("completed"),
+            func.count(Complaint.id).filter(Complaint.is_sla_breached).label("breached"),
+            func.avg(hours_between(Complaint.created_at, Complaint.resolved_at)).label("avg_hours")
+        )
+        .select_from(User)
+        .outerjoin(
+            Complaint,
+            and_(
+                Complaint.assigned_to_id == User.id,
+                Complaint.created_at >= start_date
             )
         )
-        complaints = complaint_result.scalars().all()
-        
-        total_assigned = len(complaints)
-        completed = sum(
-            1 for c in complaints 
-            if c.status in [ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED]
+        .where(User.role == UserRole.TECHNICIAN)
+        .group_by(User.id)
+        # Sort by completion rate
+        .order_by(
+            case((total_assigned > 0, completed * 100.0 / total_assigned), else_=0).desc(),
+            User.id
         )
-        breached = sum(1 for c in complaints if c.is_sla_breached)
-        
-        # Calculate average completion time
-        resolved = [c for c in complaints if c.resolved_at]
-        if resolved:
-            avg_hours = sum(
-                (c.resolved_at - c.created_at).total_seconds() / 3600 
-                for c in resolved
-            ) / len(resolved)
-        else:
-            avg_hours = 0
-        
-        stats.append({
-            "id": tech.id,
-            "name": tech.full_name or tech.email,
-            "speciality": tech.speciality,
-            "total_assigned": total_assigned,
-            "completed": completed,
-            "in_progress": total_assigned - completed,
-            "sla_breached": breached,
-            "completion_rate": round(completed / total_assigned * 100, 1) if total_assigned > 0 else 0,
-            "avg_resolution_hours": round(avg_hours, 1)
-        })
+    )
+    if building_id:
+        tech_query = tech_query.where(User.building_id == building_id)
     
-    # Sort by completion rate
-    stats.sort(key=lambda x: x["completion_rate"], reverse=True)
+    result = await db.execute(tech_query)
+    
+    stats = [
+        {
+            "id": row.id,
+            "name": row.full_name or row.email,
+            "speciality": row.speciality,
+            "total_assigned": row.total_assigned,
+            "completed": row.completed,
+            "in_progress": row.total_assigned - row.completed,
+            "sla_breached": row.breached,
+            "completion_rate": round(row.completed / row.total_assigned * 100, 1) if row.total_assigned > 0 else 0,
+            "avg_resolution_hours": round(row.avg_hours or 0, 1)
+        }
+        for row in result
+    ]
     
     return {"technicians": stats}
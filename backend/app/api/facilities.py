@@ -2,24 +2,69 @@
 FixMyCondo - Facilities API Routes
 Facility management and booking
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, and_, exists, func, tuple_, bindparam
+from sqlalchemy.orm import selectinload, raiseload
 from typing import Optional, List
 from datetime import datetime, timedelta
+import orjson
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, utcnow
 from ..models import Facility, FacilityBooking, User, Building, BookingStatus, UserRole
 from ..schemas import (
     FacilityCreate, FacilityUpdate, FacilityResponse,
-    FacilityBookingCreate, FacilityBookingUpdate, FacilityBookingResponse,
-    PaginatedResponse, UserResponse
+    FacilityBookingCreate, FacilityBookingUpdate, FacilityBookingResponse, FACILITY_BOOKING_LIST_ADAPTER,
+    PaginatedResponse, PublicUserResponse
+)
+from ..services import (
+    get_current_user, require_admin, require_committee,
+    encode_cursor, decode_cursor, cached_count,
+    cache_get, cache_set, cache_delete, cache_get_or_compute,
+    facilities_cache_key, invalidate_facilities_cache, facility_cache_key
 )
-from ..services import get_current_user, require_admin, require_committee
 
 router = APIRouter(prefix="/facilities", tags=["Facilities"])
 
+# Bookings that hold their time slot
+_ACTIVE_BOOKING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+
+# Roles that may manage other users' bookings
+_BOOKING_UPDATE_ROLES = frozenset({UserRole.SUPER_ADMIN, UserRole.BUILDING_ADMIN, UserRole.COMMITTEE})
+_BOOKING_CANCEL_ROLES = frozenset({UserRole.SUPER_ADMIN, UserRole.BUILDING_ADMIN})
+
+# Prebuilt booking statements (compiled once, parameters bound per call)
+_BOOKING_WITH_RELATIONS_STMT = select(FacilityBooking).options(
+    selectinload(FacilityBooking.facility),
+    selectinload(FacilityBooking.user),
+    raiseload("*")
+)
+_BOOKING_BY_ID_STMT = _BOOKING_WITH_RELATIONS_STMT.where(FacilityBooking.id == bindparam("booking_id"))
+_BOOKING_STMT = select(FacilityBooking).where(FacilityBooking.id == bindparam("booking_id"))
+
+# FacilityBookingResponse fields read straight off the booking row
+_BOOKING_RESPONSE_COLUMNS = tuple(
+    field for field in FacilityBookingResponse.model_fields if field not in ("facility", "user")
+)
+
+
+async def _get_cached_facility(db: AsyncSession, facility_id: int) -> FacilityResponse:
+    """Get a facility from the cache, loading it on a miss (404 if it doesn't exist)"""
+    async def load() -> str:
+        facility = await db.get(Facility, facility_id)
+        if not facility:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Facility not found"
+            )
+        return FacilityResponse.model_validate(facility).model_dump_json()
+    
+    body = await cache_get_or_compute(
+        facility_cache_key(facility_id), load, ttl=settings.FACILITIES_CACHE_TTL_SECONDS
+    )
+    return FacilityResponse.model_validate_json(body)
+
 
 # ============================================
 # FACILITY ENDPOINTS
@@ -48,6 +93,7 @@ async def create_facility(
     db.add(facility)
     await db.commit()
     await db.refresh(facility)
+    await invalidate_facilities_cache(facility.building_id)
     return facility
 
 
@@ -59,24 +105,29 @@ async def get_facilities(
     current_user: User = Depends(get_current_user)
 ):
     """Get list of facilities"""
-    query = select(Facility)
-    filters = [Facility.is_active == is_active]
-    
     # Filter by user's building if not super admin
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role != UserRole.SUPER_ADMIN:
-        if current_user.building_id:
-            filters.append(Facility.building_id == current_user.building_id)
-    elif building_id:
-        filters.append(Facility.building_id == building_id)
-    
-    query = query.where(and_(*filters)).order_by(Facility.name)
-    
-    result = await db.execute(query)
-    facilities = result.scalars().all()
-    
-    return facilities
+    if current_user.role != UserRole.SUPER_ADMIN:
+        building_id = current_user.building_id
+    
+    cache_key = facilities_cache_key(building_id, is_active)
+    body = await cache_get(cache_key)
+    if not body:
+        query = select(Facility)
+        filters = [Facility.is_active == is_active]
+        if building_id:
+            filters.append(Facility.building_id == building_id)
+        
+        query = query.where(and_(*filters)).order_by(Facility.name)
+        
+        result = await db.execute(query)
+        facilities = result.scalars().all()
+        
+        body = orjson.dumps(
+            [FacilityResponse.model_validate(f).model_dump() for f in facilities]
+        ).decode()
+        await cache_set(cache_key, body, ttl=settings.FACILITIES_CACHE_TTL_SECONDS)
+    
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{facility_id}", response_model=FacilityResponse)
@@ -86,18 +137,7 @@ async def get_facility(
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific facility"""
-    result = await db.execute(
-        select(Facility).where(Facility.id == facility_id)
-    )
-    facility = result.scalar_one_or_none()
-    
-    if not facility:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Facility not found"
-        )
-    
-    return facility
+    return await _get_cached_facility(db, facility_id)
 
 
 @router.patch("/{facility_id}", response_model=FacilityResponse)
@@ -125,6 +165,8 @@ async def update_facility(
     
     await db.commit()
     await db.refresh(facility)
+    await invalidate_facilities_cache(facility.building_id)
+    await cache_delete(facility_cache_key(facility_id))
     return facility
 
 
@@ -139,17 +181,16 @@ async def create_booking(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new facility booking"""
-    # Verify facility exists
-    result = await db.execute(
-        select(Facility).where(Facility.id == booking_data.facility_id)
-    )
-    facility = result.scalar_one_or_none()
+    # Serialize concurrent bookings of the same facility so two requests can't
+    # both pass the conflict check; released at commit/rollback (PostgreSQL only,
+    # SQLite already allows a single writer at a time)
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(booking_data.facility_id)))
     
-    if not facility:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Facility not found"
-        )
+    # Facility limits come from the cache; the conflict check and the database
+    # clock share one round trip. Two intervals overlap iff each starts before
+    # the other ends
+    facility = await _get_cached_facility(db, booking_data.facility_id)
     
     if not facility.is_active:
         raise HTTPException(
@@ -157,47 +198,33 @@ async def create_booking(
             detail="Facility is not available for booking"
         )
     
-    # Check for booking conflicts
-    conflict_result = await db.execute(
-        select(FacilityBooking).where(
-            and_(
-                FacilityBooking.facility_id == booking_data.facility_id,
-                FacilityBooking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-                or_(
-                    and_(
-                        FacilityBooking.start_time <= booking_data.start_time,
-                        FacilityBooking.end_time > booking_data.start_time
-                    ),
-                    and_(
-                        FacilityBooking.start_time < booking_data.end_time,
-                        FacilityBooking.end_time >= booking_data.end_time
-                    ),
-                    and_(
-                        FacilityBooking.start_time >= booking_data.start_time,
-                        FacilityBooking.end_time <= booking_data.end_time
-                    )
-                )
-            )
+    has_conflict = exists().where(
+        and_(
+            FacilityBooking.facility_id == booking_data.facility_id,
+            FacilityBooking.status.in_(_ACTIVE_BOOKING_STATUSES),
+            FacilityBooking.start_time < booking_data.end_time,
+            FacilityBooking.end_time > booking_data.start_time
         )
-    )
-    conflicts = conflict_result.scalars().all()
+    ).label("has_conflict")
+    result = await db.execute(select(has_conflict, utcnow().label("server_now")))
+    has_conflict, server_now = result.one()
     
-    if conflicts:
+    if has_conflict:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Time slot conflicts with existing booking"
         )
     
     # Check advance booking limit
-    max_advance = datetime.utcnow() + timedelta(days=facility.advance_booking_days)
+    max_advance = server_now + timedelta(days=facility.advance_booking_days)
     if booking_data.booking_date > max_advance:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Cannot book more than {facility.advance_booking_days} days in advance"
         )
     
-    # Calculate booking duration and fees
-    duration_hours = (booking_data.end_time - booking_data.start_time).total_seconds() / 3600
+    # Duration is validated positive by the schema; the bounds depend on the facility
+    duration_hours = booking_data.duration_hours
     
     if duration_hours < facility.min_booking_hours:
         raise HTTPException(
@@ -213,23 +240,23 @@ async def create_booking(
     
     total_fee = facility.booking_fee * duration_hours
     
-    # Create booking
-    booking = FacilityBooking(
-        facility_id=booking_data.facility_id,
-        user_id=current_user.id,
-        booking_date=booking_data.booking_date,
-        start_time=booking_data.start_time,
-        end_time=booking_data.end_time,
-        number_of_guests=booking_data.number_of_guests,
-        purpose=booking_data.purpose,
-        total_fee=total_fee,
-        deposit_paid=0.0,
-        status=BookingStatus.PENDING
+    # Create booking, reading the new row back with RETURNING instead of a refresh
+    result = await db.execute(
+        insert(FacilityBooking).values(
+            facility_id=booking_data.facility_id,
+            user_id=current_user.id,
+            booking_date=booking_data.booking_date,
+            start_time=booking_data.start_time,
+            end_time=booking_data.end_time,
+            number_of_guests=booking_data.number_of_guests,
+            purpose=booking_data.purpose,
+            total_fee=total_fee,
+            deposit_paid=0.0,
+            status=BookingStatus.PENDING
+        ).returning(FacilityBooking)
     )
-    
-    db.add(booking)
+    booking = result.scalar_one()
     await db.commit()
-    await db.refresh(booking)
     
     return _serialize_booking(booking, facility, current_user)
 
@@ -242,21 +269,17 @@ async def get_bookings(
     status: Optional[BookingStatus] = None,
     my_bookings: bool = False,
     upcoming: bool = False,
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor; overrides page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of facility bookings"""
-    query = select(FacilityBooking).options(
-        selectinload(FacilityBooking.facility),
-        selectinload(FacilityBooking.user)
-    )
+    query = _BOOKING_WITH_RELATIONS_STMT
     
     filters = []
     
     # Role-based filtering
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if user_role == UserRole.RESIDENT or my_bookings:
+    if current_user.role == UserRole.RESIDENT or my_bookings:
         filters.append(FacilityBooking.user_id == current_user.id)
     
     if facility_id:
@@ -269,34 +292,51 @@ async def get_bookings(
     if filters:
         query = query.where(and_(*filters))
     
-    query = query.order_by(FacilityBooking.booking_date.desc())
+    # Latest first (id breaks ties for stable keyset pages)
+    query = query.order_by(FacilityBooking.booking_date.desc(), FacilityBooking.id.desc())
     
     # Get total count
     count_query = select(func.count(FacilityBooking.id))
     if filters:
         count_query = count_query.where(and_(*filters))
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
     
-    # Apply pagination
+    # Apply pagination: keyset when a cursor is given, offset otherwise,
+    # with one extra row to tell whether this is the last page
     offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor, datetime, int)
+        query = query.where(tuple_(FacilityBooking.booking_date, FacilityBooking.id) < (cursor_date, cursor_id))
+    else:
+        query = query.offset(offset)
+    query = query.limit(page_size + 1)
     
     result = await db.execute(query)
     bookings = result.scalars().all()
+    has_next = len(bookings) > page_size
+    bookings = bookings[:page_size]
+    
+    # On the last offset page the total follows from the offset; only count otherwise
+    if cursor or has_next or (offset and not bookings):
+        total = await cached_count(db, "bookings:count", count_query)
+    else:
+        total = offset + len(bookings)
     
-    items = [
-        _serialize_booking(b, b.facility, b.user)
-        for b in bookings
-    ]
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(bookings[-1].booking_date, bookings[-1].id)
     
-    return PaginatedResponse(
-        items=items,
+    page_response = PaginatedResponse(
+        items=FACILITY_BOOKING_LIST_ADAPTER.validate_python(bookings, from_attributes=True),
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
+        total_pages=(total + page_size - 1) // page_size,
+        has_next=has_next,
+        next_cursor=next_cursor
     )
+    # Encoded straight to JSON bytes by pydantic-core, skipping FastAPI's
+    # second validation and encoding pass over the items
+    return Response(content=page_response.model_dump_json(), media_type="application/json")
 
 
 @router.get("/bookings/{booking_id}", response_model=FacilityBookingResponse)
@@ -306,14 +346,7 @@ async def get_booking(
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific booking"""
-    result = await db.execute(
-        select(FacilityBooking)
-        .options(
-            selectinload(FacilityBooking.facility),
-            selectinload(FacilityBooking.user)
-        )
-        .where(FacilityBooking.id == booking_id)
-    )
+    result = await db.execute(_BOOKING_BY_ID_STMT, {"booking_id": booking_id})
     booking = result.scalar_one_or_none()
     
     if not booking:
@@ -333,14 +366,7 @@ async def update_booking(
     current_user: User = Depends(get_current_user)
 ):
     """Update a booking status"""
-    result = await db.execute(
-        select(FacilityBooking)
-        .options(
-            selectinload(FacilityBooking.facility),
-            selectinload(FacilityBooking.user)
-        )
-        .where(FacilityBooking.id == booking_id)
-    )
+    result = await db.execute(_BOOKING_BY_ID_STMT, {"booking_id": booking_id})
     booking = result.scalar_one_or_none()
     
     if not booking:
@@ -350,9 +376,7 @@ async def update_booking(
         )
     
     # Only owner or admin can update
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if booking.user_id != current_user.id and user_role not in [UserRole.SUPER_ADMIN, UserRole.BUILDING_ADMIN, UserRole.COMMITTEE]:
+    if booking.user_id != current_user.id and current_user.role not in _BOOKING_UPDATE_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
@@ -375,9 +399,7 @@ async def cancel_booking(
     current_user: User = Depends(get_current_user)
 ):
     """Cancel a booking"""
-    result = await db.execute(
-        select(FacilityBooking).where(FacilityBooking.id == booking_id)
-    )
+    result = await db.execute(_BOOKING_STMT, {"booking_id": booking_id})
     booking = result.scalar_one_or_none()
     
     if not booking:
@@ -387,9 +409,7 @@ async def cancel_booking(
         )
     
     # Only owner or admin can cancel
-    user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-    
-    if booking.user_id != current_user.id and user_role not in [UserRole.SUPER_ADMIN, UserRole.BUILDING_ADMIN]:
+    if booking.user_id != current_user.id and current_user.role not in _BOOKING_CANCEL_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
@@ -401,43 +421,9 @@ async def cancel_booking(
 
 def _serialize_booking(booking: FacilityBooking, facility: Facility, user: User) -> FacilityBookingResponse:
     """Helper to serialize booking response"""
-    return FacilityBookingResponse(
-        id=booking.id,
-        facility_id=booking.facility_id,
-        user_id=booking.user_id,
-        booking_date=booking.booking_date,
-        start_time=booking.start_time,
-        end_time=booking.end_time,
-        number_of_guests=booking.number_of_guests,
-        purpose=booking.purpose,
-        total_fee=booking.total_fee,
-        deposit_paid=booking.deposit_paid,
-        is_paid=booking.is_paid,
-        status=booking.status,
-        created_at=booking.created_at,
-        facility=FacilityResponse(
-            id=facility.id,
-            building_id=facility.building_id,
-            name=facility.name,
-            description=facility.description,
-            location=facility.location,
-            capacity=facility.capacity,
-            booking_fee=facility.booking_fee,
-            deposit_required=facility.deposit_required,
-            min_booking_hours=facility.min_booking_hours,
-            max_booking_hours=facility.max_booking_hours,
-            advance_booking_days=facility.advance_booking_days,
-            is_active=facility.is_active,
-            created_at=facility.created_at
-        ) if facility else None,
-        user=UserResponse(
-            id=user.id,
-            email=user.email,
-            full_name=user.full_name,
-            phone=user.phone,
-            role=user.role,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            created_at=user.created_at
-        ) if user else None
+    # Booking columns are already typed by the ORM, so skip re-validating them
+    return FacilityBookingResponse.model_construct(
+        **{field: getattr(booking, field) for field in _BOOKING_RESPONSE_COLUMNS},
+        facility=FacilityResponse.model_validate(facility) if facility else None,
+        user=PublicUserResponse.model_validate(user) if user else None
     )
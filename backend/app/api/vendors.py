@@ -4,21 +4,28 @@ Vendor management and quote handling
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, and_, func, tuple_, literal_column
+from sqlalchemy.orm import selectinload, raiseload
 from typing import Optional, List
+import asyncio
 
-from ..database import get_db
+from ..database import get_db, scalar_in_new_session
 from ..models import Vendor, VendorQuote, Complaint, User, VendorQuoteStatus, UserRole
 from ..schemas import (
     VendorCreate, VendorUpdate, VendorResponse,
     VendorQuoteCreate, VendorQuoteUpdate, VendorQuoteResponse,
     PaginatedResponse
 )
-from ..services import get_current_user, require_admin, require_committee
+from ..services import (
+    get_current_user, require_admin, require_committee,
+    encode_cursor, decode_cursor, cached_count
+)
 
 router = APIRouter(prefix="/vendors", tags=["Vendors"])
 
+# Columns backing VendorResponse, selected directly for list pages
+_VENDOR_LIST_COLUMNS = tuple(getattr(Vendor, field) for field in VendorResponse.model_fields)
+
 
 # ============================================
 # VENDOR ENDPOINTS
@@ -31,10 +38,11 @@ async def create_vendor(
     current_user: User = Depends(require_admin)
 ):
     """Create a new vendor (admin only)"""
-    vendor = Vendor(**vendor_data.model_dump())
-    db.add(vendor)
+    result = await db.execute(
+        insert(Vendor).values(**vendor_data.model_dump()).returning(Vendor)
+    )
+    vendor = result.scalar_one()
     await db.commit()
-    await db.refresh(vendor)
     return vendor
 
 
@@ -46,11 +54,12 @@ async def get_vendors(
     is_verified: Optional[bool] = None,
     is_active: bool = True,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor; overrides page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of vendors with filtering"""
-    query = select(Vendor)
+    query = select(*_VENDOR_LIST_COLUMNS)
     filters = [Vendor.is_active == is_active]
     
     if service_type:
@@ -66,36 +75,42 @@ async def get_vendors(
     query = query.where(and_(*filters))
     
     # Get total count
-    count_result = await db.execute(
-        select(func.count(Vendor.id)).where(and_(*filters))
-    )
-    total = count_result.scalar()
+    count_query = select(func.count(Vendor.id)).where(and_(*filters))
+    
+    # Highest rated first (id breaks ties for stable keyset pages); unrated sorts as 0.
+    # The 0.0 is inlined so the expression matches ix_vendors_active_rating_id
+    rating = func.coalesce(Vendor.rating, literal_column("0.0"))
+    query = query.order_by(rating.desc(), Vendor.id.desc())
     
-    # Apply pagination and ordering
+    # Apply pagination: keyset when a cursor is given, offset otherwise,
+    # with one extra row to tell whether this is the last page
     offset = (page - 1) * page_size
-    query = query.order_by(Vendor.rating.desc(), Vendor.name).offset(offset).limit(page_size)
+    if cursor:
+        cursor_rating, cursor_id = decode_cursor(cursor, float, int)
+        query = query.where(tuple_(rating, Vendor.id) < (cursor_rating, cursor_id))
+    else:
+        query = query.offset(offset)
+    query = query.limit(page_size + 1)
     
     result = await db.execute(query)
-    vendors = result.scalars().all()
+    rows = result.all()
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    # On the last offset page the total follows from the offset; only count otherwise
+    if cursor or has_next or (offset and not rows):
+        total = await cached_count(db, "vendors:count", count_query)
+    else:
+        total = offset + len(rows)
+    
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(rows[-1].rating or 0.0, rows[-1].id)
     
+    # Rows come straight from the database, so skip per-item validation
     items = [
-        VendorResponse(
-            id=v.id,
-            name=v.name,
-            company_name=v.company_name,
-            email=v.email,
-            phone=v.phone,
-            service_type=v.service_type,
-            license_number=v.license_number,
-            insurance_valid_until=v.insurance_valid_until,
-            rating=v.rating,
-            total_jobs=v.total_jobs,
-            completed_jobs=v.completed_jobs,
-            is_verified=v.is_verified,
-            is_active=v.is_active,
-            created_at=v.created_at
-        )
-        for v in vendors
+        VendorResponse.model_construct(**{field: row._mapping[field] for field in VendorResponse.model_fields})
+        for row in rows
     ]
     
     return PaginatedResponse(
@@ -103,7 +118,9 @@ async def get_vendors(
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
+        total_pages=(total + page_size - 1) // page_size,
+        has_next=has_next,
+        next_cursor=next_cursor
     )
 
 
@@ -189,22 +206,26 @@ async def create_vendor_quote(
     current_user: User = Depends(require_committee)
 ):
     """Create a vendor quote for a complaint"""
-    # Verify complaint exists
-    complaint_result = await db.execute(
-        select(Complaint).where(Complaint.id == quote_data.complaint_id)
+    # Check the complaint exists (on a second session) while bumping the vendor's
+    # total jobs in place; the UPDATE returns no row when there is no such vendor
+    complaint_id, vendor_result = await asyncio.gather(
+        scalar_in_new_session(select(Complaint.id).where(Complaint.id == quote_data.complaint_id)),
+        db.execute(
+            update(Vendor)
+            .where(Vendor.id == quote_data.vendor_id)
+            .values(total_jobs=Vendor.total_jobs + 1)
+            .returning(Vendor)
+        )
     )
-    complaint = complaint_result.scalar_one_or_none()
     
-    if not complaint:
+    # Verify complaint exists
+    if complaint_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Complaint not found"
         )
     
     # Verify vendor exists
-    vendor_result = await db.execute(
-        select(Vendor).where(Vendor.id == quote_data.vendor_id)
-    )
     vendor = vendor_result.scalar_one_or_none()
     
     if not vendor:
@@ -214,14 +235,12 @@ async def create_vendor_quote(
         )
     
     # Create quote
-    quote = VendorQuote(**quote_data.model_dump())
-    db.add(quote)
-    
-    # Update vendor total jobs
-    vendor.total_jobs += 1
+    result = await db.execute(
+        insert(VendorQuote).values(**quote_data.model_dump()).returning(VendorQuote)
+    )
+    quote = result.scalar_one()
     
     await db.commit()
-    await db.refresh(quote)
     
     return VendorQuoteResponse(
         id=quote.id,
@@ -260,7 +279,7 @@ async def get_complaint_quotes(
     """Get all vendor quotes for a complaint"""
     result = await db.execute(
         select(VendorQuote)
-        .options(selectinload(VendorQuote.vendor))
+        .options(selectinload(VendorQuote.vendor), raiseload("*"))
         .where(VendorQuote.complaint_id == complaint_id)
         .order_by(VendorQuote.amount)
     )
@@ -307,7 +326,7 @@ async def update_quote_status(
     """Update vendor quote status (approve/reject)"""
     result = await db.execute(
         select(VendorQuote)
-        .options(selectinload(VendorQuote.vendor))
+        .options(selectinload(VendorQuote.vendor), raiseload("*"))
         .where(VendorQuote.id == quote_id)
     )
     quote = result.scalar_one_or_none()
@@ -322,18 +341,21 @@ async def update_quote_status(
     
     # If approved, update complaint estimated cost
     if update_data.status == VendorQuoteStatus.APPROVED:
-        complaint_result = await db.execute(
-            select(Complaint).where(Complaint.id == quote.complaint_id)
+        await db.execute(
+            update(Complaint)
+            .where(Complaint.id == quote.complaint_id)
+            .values(estimated_cost=quote.amount)
         )
-        complaint = complaint_result.scalar_one_or_none()
-        if complaint:
-            complaint.estimated_cost = quote.amount
         
-        # Update vendor completed jobs on completion
-        quote.vendor.completed_jobs += 1
+        # Update vendor completed jobs on completion, incrementing in place so
+        # concurrent approvals can't lose a count (the loaded vendor is synced)
+        await db.execute(
+            update(Vendor)
+            .where(Vendor.id == quote.vendor_id)
+            .values(completed_jobs=Vendor.completed_jobs + 1)
+        )
     
     await db.commit()
-    await db.refresh(quote)
     
     return VendorQuoteResponse(
         id=quote.id,
@@ -4,7 +4,7 @@ Settings management using Pydantic
 """
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from functools import lru_cache
+from functools import lru_cache, cached_property
 from typing import Optional, List
 import os
 
@@ -17,23 +17,57 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = True
     PORT: int = 9030
+    WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))  # uvicorn processes when not reloading
+    VERCEL: bool = False  # set by the Vercel runtime
     SECRET_KEY: str = "your-super-secret-key-change-in-production"
     
     # Database
-    DATABASE_URL: str = "sqlite+aiosqlite:///./fixmycondo.db"
+    DATABASE_URL: str = "sqlite+aiosqlite:///./fixmycondo.db"  # development default
+    DB_QUERY_CACHE_SIZE: int = 1200  # compiled statement cache entries
+    DB_ECHO: bool = False  # log every SQL statement (development only)
+    
+    # Connection pool (server databases only; SQLite uses SQLAlchemy's default pool)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_MAX_CONNECTIONS: int = 0  # server connections shared by all WORKERS; 0 = no cap
+    
+    # asyncpg statement caches (PostgreSQL only)
+    DB_STATEMENT_CACHE_SIZE: int = 1024
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 512
+    DB_JIT: bool = False  # JIT planning costs more than it saves on short OLTP queries
     
     # Redis
     REDIS_URL: Optional[str] = None
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_LOCK_TIMEOUT_SECONDS: int = 10  # longest a recompute may hold a key's lock
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # >1 refreshes hot keys earlier, 0 disables
+    COUNT_CACHE_TTL_SECONDS: int = 30  # list totals tolerate a little staleness
+    COUNT_CACHE_MIN_ROWS: int = 100  # smaller totals are always counted exactly
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+    COMPLAINT_STATS_CACHE_TTL_SECONDS: int = 300
+    FACILITIES_CACHE_TTL_SECONDS: int = 3600  # invalidated on every facility write
+    DASHBOARD_VIEW_REFRESH_DELAY_SECONDS: float = 5.0  # PostgreSQL only; coalesces bursts of writes
+    DASHBOARD_PRECOMPUTE_INTERVAL_SECONDS: int = 30  # background stats refresh (needs Redis); 0 = off
     
     # JWT Configuration
     JWT_SECRET_KEY: str = "jwt-secret-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_DECODE_CACHE_SIZE: int = 8192  # verified tokens kept in memory per process
+    USER_LOCAL_CACHE_TTL_SECONDS: int = 10  # per-process user cache in front of Redis; 0 = off
+    USER_LOCAL_CACHE_SIZE: int = 5000
+    
+    # Password hashing (bcrypt work factor, 2^rounds iterations)
+    BCRYPT_ROUNDS: int = 12
     
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    SERVE_UPLOADS: bool = False  # serve /uploads from the app even when DEBUG is off
     ALLOWED_IMAGE_TYPES: List[str] = ["image/jpeg", "image/png", "image/gif"]
     ALLOWED_VIDEO_TYPES: List[str] = ["video/mp4", "video/quicktime"]
     ALLOWED_DOCUMENT_TYPES: List[str] = ["application/pdf"]
@@ -51,9 +85,25 @@ class Settings(BaseSettings):
     # CORS - accepts comma-separated string from env
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:8081,http://localhost:19006,*"
     
-    @property
+    # Response compression (smaller bodies aren't worth the CPU)
+    GZIP_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESS_LEVEL: int = 5
+    
+    # /health probe
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 1.0  # per dependency ping
+    HEALTH_CACHE_SECONDS: float = 2.0  # reuse a healthy result for this long
+    
+    @field_validator("DATABASE_URL")
+    @classmethod
+    def require_server_database_in_production(cls, value: str, info) -> str:
+        """SQLite serializes every write, so deployments must point at PostgreSQL"""
+        if info.data.get("VERCEL") and value.startswith("sqlite"):
+            raise ValueError("DATABASE_URL must be a PostgreSQL URL (postgresql+asyncpg://...) in production")
+        return value
+    
+    @cached_property
     def cors_origins_list(self) -> List[str]:
-        """Parse CORS origins from comma-separated string"""
+        """Parse CORS origins from comma-separated string (once per settings instance)"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
     class Config:
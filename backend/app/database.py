@@ -4,7 +4,12 @@ SQLAlchemy async setup with SQLite
 """
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, Float, DateTime
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+import orjson
+
 from .config import settings
 
 # Naming convention for constraints
@@ -22,14 +27,115 @@ metadata = MetaData(naming_convention=convention)
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models"""
     metadata = metadata
+    # Timestamps and generated columns are set by the database; fetch them with
+    # RETURNING on update as well as insert so they never need a lazy load
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class hours_between(FunctionElement):
+    """SQL expression for the hours elapsed between two timestamps: hours_between(start, end)"""
+    type = Float()
+    name = "hours_between"
+    inherit_cache = True
+
+
+@compiles(hours_between)
+def _compile_hours_between(element, compiler, **kw):
+    start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"EXTRACT(EPOCH FROM ({end} - {start})) / 3600.0"
+
+
+@compiles(hours_between, "sqlite")
+def _compile_hours_between_sqlite(element, compiler, **kw):
+    start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"(julianday({end}) - julianday({start})) * 24.0"
+
+
+class utcnow(FunctionElement):
+    """SQL expression for the current UTC time as a naive timestamp, matching datetime.utcnow()"""
+    type = DateTime()
+    name = "utcnow"
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    return "(now() AT TIME ZONE 'utc')"
+
+
+@compiles(utcnow, "sqlite")
+def _compile_utcnow_sqlite(element, compiler, **kw):
+    # Same text format as the stored datetimes (microseconds padded from
+    # milliseconds), so they compare and sort correctly against them
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now') || '000')"
+
+
+class add_hours(FunctionElement):
+    """SQL expression for a timestamp shifted by a number of hours: add_hours(timestamp, hours)"""
+    type = DateTime()
+    name = "add_hours"
+    inherit_cache = True
+
+
+@compiles(add_hours)
+def _compile_add_hours(element, compiler, **kw):
+    timestamp, hours = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"({timestamp} + make_interval(hours => {hours}))"
+
+
+@compiles(add_hours, "sqlite")
+def _compile_add_hours_sqlite(element, compiler, **kw):
+    timestamp, hours = (compiler.process(arg, **kw) for arg in element.clauses)
+    # strftime's %f keeps only milliseconds; whole hours never change the
+    # fraction, so carry the stored one over and keep full microseconds
+    return f"(strftime('%Y-%m-%d %H:%M:%S', {timestamp}, '+' || {hours} || ' hours') || substr({timestamp}, 20))"
+
+
+def _pool_limits() -> tuple:
+    """Per-process pool size and overflow, within this worker's share of DB_MAX_CONNECTIONS"""
+    pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    if settings.DB_MAX_CONNECTIONS:
+        share = max(settings.DB_MAX_CONNECTIONS // max(settings.WORKERS, 1), 1)
+        pool_size = min(pool_size, share)
+        max_overflow = min(max_overflow, share - pool_size)
+    return pool_size, max_overflow
+
+
+def _engine_options() -> dict:
+    """Engine keyword arguments for the configured database backend"""
+    url = make_url(settings.DATABASE_URL)
+    options = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+        # Used for JSON columns by every dialect, including asyncpg's json/jsonb codecs
+        "json_serializer": lambda obj: orjson.dumps(obj).decode(),
+        "json_deserializer": orjson.loads
+    }
+    
+    if url.get_backend_name() != "sqlite":
+        pool_size, max_overflow = _pool_limits()
+        options.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+    
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            # Applied in the startup packet, so no extra SET round-trip per connection
+            "server_settings": {"jit": "on" if settings.DB_JIT else "off"}
+        }
+    
+    return options
 
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options())
 
 # Create session factory
 async_session = async_sessionmaker(
@@ -40,16 +146,34 @@ async_session = async_sessionmaker(
 
 
 async def get_db() -> AsyncSession:
-    """Dependency to get database session"""
+    """Dependency to get database session (handlers that write commit explicitly)"""
     async with async_session() as session:
         try:
             yield session
-            await session.commit()
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
+
+
+async def scalar_in_new_session(statement):
+    """Run a scalar query on its own session (e.g. alongside the request's session)"""
+    async with async_session() as session:
+        result = await session.execute(statement)
+        return result.scalar()
+
+
+async def all_in_new_session(statement):
+    """Run a multi-row query on its own session (e.g. alongside the request's session)"""
+    async with async_session() as session:
+        result = await session.execute(statement)
+        return result.all()
+
+
+async def one_in_new_session(statement):
+    """Run a single-row query on its own session (e.g. alongside the request's session)"""
+    async with async_session() as session:
+        result = await session.execute(statement)
+        return result.one()
 
 
 async def create_tables():
@@ -3,21 +3,40 @@ FixMyCondo - Main FastAPI Application
 Entry point for the backend API server
 """
 from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
+from sqlalchemy import text
 import os
+import sys
+import time
+import queue
+import asyncio
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 
 from .config import settings
-from .database import create_tables
+from .database import create_tables, engine
 from .api import api_router
+from .middleware import FastCORSMiddleware
+from .services import (
+    get_redis, close_redis, start_dashboard_stats_refresher, stop_dashboard_stats_refresher
+)
 
-# Configure logging
+# Configure logging: records are only queued on the event loop, and a
+# background listener thread (run for the app's lifespan) writes them out
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+# The queued record's message already carries any traceback; the listener adds the prefix
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
 logging.basicConfig(
     level=logging.DEBUG if settings.DEBUG else logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    handlers=[_queue_handler]
 )
 logger = logging.getLogger(__name__)
 
@@ -26,6 +45,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
+    log_listener.start()
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     
     # Create database tables
@@ -56,7 +76,7 @@ async def lifespan(app: FastAPI):
             # Admin user
             admin = User(
                 email="admin@fixmycondo.com",
-                hashed_password=hash_password("Admin@123"),
+                hashed_password=await hash_password("Admin@123"),
                 full_name="Super Admin",
                 role=UserRole.ADMIN,
                 is_active=True,
@@ -65,7 +85,7 @@ async def lifespan(app: FastAPI):
             # Test Resident
             resident = User(
                 email="resident@example.com",
-                hashed_password=hash_password("User@123"),
+                hashed_password=await hash_password("User@123"),
                 full_name="Test Resident",
                 role=UserRole.RESIDENT,
                 is_active=True,
@@ -74,11 +94,18 @@ async def lifespan(app: FastAPI):
             db.add_all([admin, resident])
             await db.commit()
             logger.info("Test users created: admin@fixmycondo.com and resident@example.com")
+    
+    # Keep dashboard stats warm in Redis so reads rarely aggregate
+    start_dashboard_stats_refresher()
             
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    await stop_dashboard_stats_refresher()
+    await close_redis()
+    # Flushes queued records before the listener thread exits
+    log_listener.stop()
 
 
 # Create FastAPI application
@@ -105,25 +132,37 @@ app = FastAPI(
     """,
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
 
-# CORS middleware
-# CORS middleware
+# CORS middleware (header values are built once from these in the middleware constructor)
+_CORS_ORIGINS = frozenset(settings.cors_origins_list)
+_CORS_ALLOW_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+_CORS_ALLOW_HEADERS = ("*",)
+
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins_list,
+    FastCORSMiddleware,
+    allow_origins=_CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=_CORS_ALLOW_METHODS,
+    allow_headers=_CORS_ALLOW_HEADERS,
+)
+
+# Added after CORS so it wraps it; preflight bodies are far below the minimum size anyway
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL,
 )
 
 # Include API routes
 app.include_router(api_router)
 
-# Mount static files for uploads
-if os.path.exists(settings.UPLOAD_DIR):
+# Mount static files for uploads; in production the reverse proxy serves
+# UPLOAD_DIR directly so file reads never compete with API requests
+if (settings.DEBUG or settings.SERVE_UPLOADS) and os.path.exists(settings.UPLOAD_DIR):
     app.mount(
         "/uploads",
         StaticFiles(directory=settings.UPLOAD_DIR),
@@ -131,36 +170,73 @@ if os.path.exists(settings.UPLOAD_DIR):
     )
 
 
+# The root response never changes while the process runs, so serialize it once
+_ROOT_BODY = orjson.dumps({
+    "name": settings.APP_NAME,
+    "version": settings.APP_VERSION,
+    "status": "healthy",
+    "docs": "/docs"
+})
+
+# Last healthy /health body and when it was probed, reused briefly so frequent
+# orchestrator probes don't each hit the database and Redis
+_last_healthy = (float("-inf"), b"")
+
+
 # Root endpoint
 @app.get("/", tags=["Health"])
 async def root():
     """Root endpoint - API health check"""
-    return {
-        "name": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "status": "healthy",
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+
+async def _ping_database() -> str:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return "connected"
+
+
+async def _ping_redis() -> str:
+    client = get_redis()
+    if client is None:
+        return "not configured"
+    await client.ping()
+    return "connected"
 
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """Health check endpoint for monitoring"""
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "redis": "connected" if settings.REDIS_URL else "not configured"
-    }
+    """Health check endpoint for monitoring (503 when the database or Redis is unreachable)"""
+    global _last_healthy
+    probed_at, body = _last_healthy
+    if time.monotonic() - probed_at < settings.HEALTH_CACHE_SECONDS:
+        return Response(content=body, media_type="application/json")
+    
+    timeout = settings.HEALTH_CHECK_TIMEOUT_SECONDS
+    database, redis = await asyncio.gather(
+        asyncio.wait_for(_ping_database(), timeout),
+        asyncio.wait_for(_ping_redis(), timeout),
+        return_exceptions=True
+    )
+    healthy = not isinstance(database, Exception) and not isinstance(redis, Exception)
+    body = orjson.dumps({
+        "status": "healthy" if healthy else "unhealthy",
+        "database": "unhealthy" if isinstance(database, Exception) else database,
+        "redis": "unhealthy" if isinstance(redis, Exception) else redis
+    })
+    if not healthy:
+        logger.warning(f"Health check failed: database={database!r} redis={redis!r}")
+        return Response(content=body, status_code=503, media_type="application/json")
+    
+    _last_healthy = (time.monotonic(), body)
+    return Response(content=body, media_type="application/json")
 
 
-@app.get("/favicon.ico", include_in_schema=False)
-async def favicon():
-    from fastapi.responses import FileResponse
-    # Return a dummy response or a real file if available
-    # For now, just return 404 to be semantically correct but without raising error in logs
-    # Or better, 204 No Content
-    from fastapi.responses import Response
-    return Response(status_code=204)
+# No icon to serve; 204 keeps browsers and crawlers quiet without a 404 in the logs.
+# A Response is itself an ASGI app, so the route serves this one instance directly
+# without building a Request or resolving dependencies.
+_FAVICON_RESPONSE = Response(status_code=204)
+app.router.add_route("/favicon.ico", _FAVICON_RESPONSE, include_in_schema=False)
 
 
 # Global exception handler
@@ -168,7 +244,7 @@ async def favicon():
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle all unhandled exceptions"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
@@ -184,5 +260,10 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=settings.PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # The reloader supports a single process only
+        workers=1 if settings.DEBUG else settings.WORKERS,
+        # C event loop and HTTP parser; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
@@ -0,0 +1,165 @@
+"""
+FixMyCondo - ASGI Middleware
+CORS handling with response headers precomputed at startup
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+SAFELISTED_HEADERS = {"Accept", "Accept-Language", "Content-Language", "Content-Type"}
+
+Header = Tuple[bytes, bytes]
+
+
+def _plain_text_headers(body: bytes) -> List[Header]:
+    return [
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+
+
+class FastCORSMiddleware:
+    """
+    Pure ASGI CORS middleware, behaving like Starlette's CORSMiddleware but
+    reading raw scope headers and appending prebuilt header tuples rather
+    than parsing header objects on every request.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Iterable[str] = (),
+        allow_methods: Iterable[str] = ("GET",),
+        allow_headers: Iterable[str] = (),
+        allow_credentials: bool = False,
+        max_age: int = 600
+    ) -> None:
+        allow_origins = frozenset(allow_origins)
+        allow_methods = tuple(allow_methods)
+        allow_headers = sorted(SAFELISTED_HEADERS | set(allow_headers))
+        if "*" in allow_methods:
+            allow_methods = ALL_METHODS
+        
+        self.app = app
+        self.allow_all_origins = "*" in allow_origins
+        self.allow_all_headers = "*" in allow_headers
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.allow_methods = frozenset(method.encode("latin-1") for method in allow_methods)
+        self.allow_headers = frozenset(h.lower() for h in allow_headers)
+        # With credentials a wildcard origin is not accepted, so the request's is echoed
+        self.explicit_preflight_origin = not self.allow_all_origins or allow_credentials
+        
+        simple_headers: List[Header] = []
+        if self.allow_all_origins:
+            simple_headers.append((b"access-control-allow-origin", b"*"))
+        if allow_credentials:
+            simple_headers.append((b"access-control-allow-credentials", b"true"))
+        self.simple_headers = simple_headers
+        
+        preflight_headers: List[Header] = []
+        if self.explicit_preflight_origin:
+            preflight_headers.append((b"vary", b"Origin"))
+        else:
+            preflight_headers.append((b"access-control-allow-origin", b"*"))
+        preflight_headers.append((b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")))
+        preflight_headers.append((b"access-control-max-age", str(max_age).encode("latin-1")))
+        if not self.allow_all_headers:
+            preflight_headers.append(
+                (b"access-control-allow-headers", ", ".join(allow_headers).encode("latin-1"))
+            )
+        if allow_credentials:
+            preflight_headers.append((b"access-control-allow-credentials", b"true"))
+        self.preflight_headers = preflight_headers
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin: Optional[bytes] = None
+        request_method: Optional[bytes] = None
+        request_headers: Optional[bytes] = None
+        has_cookie = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+            elif name == b"cookie":
+                has_cookie = True
+        
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self.preflight_response(send, origin, request_method, request_headers)
+            return
+        
+        # Echo the origin when it must be explicit: a cookie makes "*" unusable,
+        # and an origin allow-list has no single value to send
+        if self.allow_all_origins:
+            echo_origin = has_cookie
+        else:
+            echo_origin = origin in self.allow_origins
+        
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", ()), *self.simple_headers]
+                if echo_origin:
+                    headers = self._allow_explicit_origin(headers, origin)
+                message["headers"] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+    
+    async def preflight_response(
+        self, send: Send, origin: bytes, request_method: bytes, request_headers: Optional[bytes]
+    ) -> None:
+        """Answer a CORS preflight request without reaching the application"""
+        headers = list(self.preflight_headers)
+        failures = []
+        
+        if self.allow_all_origins or origin in self.allow_origins:
+            if self.explicit_preflight_origin:
+                headers.append((b"access-control-allow-origin", origin))
+        else:
+            failures.append("origin")
+        
+        if request_method not in self.allow_methods:
+            failures.append("method")
+        
+        # Allowing all headers means mirroring back whatever was requested
+        if request_headers is not None:
+            if self.allow_all_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+            else:
+                requested = request_headers.decode("latin-1").lower().split(",")
+                if any(header.strip() not in self.allow_headers for header in requested):
+                    failures.append("headers")
+        
+        if failures:
+            status_code, body = 400, ("Disallowed CORS " + ", ".join(failures)).encode()
+        else:
+            status_code, body = 200, b"OK"
+        
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": headers + _plain_text_headers(body),
+        })
+        await send({"type": "http.response.body", "body": body})
+    
+    @staticmethod
+    def _allow_explicit_origin(headers: List[Header], origin: bytes) -> List[Header]:
+        headers = [(name, value) for name, value in headers if name != b"access-control-allow-origin"]
+        headers.append((b"access-control-allow-origin", origin))
+        for index, (name, value) in enumerate(headers):
+            if name == b"vary":
+                headers[index] = (name, value + b", Origin")
+                return headers
+        headers.append((b"vary", b"Origin"))
+        return headers
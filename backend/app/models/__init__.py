@@ -4,12 +4,24 @@ All SQLAlchemy models for the application
 """
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, DateTime, Float, 
-    ForeignKey, Enum as SQLEnum, Table, JSON
+    ForeignKey, Enum as SQLEnum, Table, JSON, Index, CheckConstraint, Computed,
+    and_, text, literal_column, DDL, event
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
 import enum
-from ..database import Base
+from ..database import Base, utcnow, add_hours
+
+# JSON documents, stored as binary JSONB on PostgreSQL
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+def StringEnum(enum_class: type) -> SQLEnum:
+    """Enum column stored as VARCHAR of member names, not a native PostgreSQL enum type"""
+    # Adding a member then needs no ALTER TYPE; 32 leaves room for longer names
+    return SQLEnum(enum_class, native_enum=False, length=32)
 
 
 # ============================================
@@ -40,6 +52,10 @@ class ComplaintStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+# Statuses at which the SLA clock stops
+SLA_STOPPED_STATUSES = (ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED, ComplaintStatus.CANCELLED)
+
+
 class ComplaintPriority(str, enum.Enum):
     """Complaint priority levels"""
     LOW = "low"
@@ -86,6 +102,12 @@ class VendorQuoteStatus(str, enum.Enum):
 class Building(Base):
     """Building/Condo information"""
     __tablename__ = "buildings"
+    __table_args__ = (
+        # Keyset pagination order for the building list
+        Index("ix_buildings_name_id", "name", "id"),
+        # Active-only building list, already in name order
+        Index("ix_buildings_is_active_name", "is_active", "name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -107,8 +129,8 @@ class Building(Base):
     is_active = Column(Boolean, default=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     units = relationship("Unit", back_populates="building", cascade="all, delete-orphan")
@@ -120,6 +142,10 @@ class Building(Base):
 class Unit(Base):
     """Individual units/apartments in a building"""
     __tablename__ = "units"
+    __table_args__ = (
+        # Per-building unit listing in (block, floor, unit_number) order
+        Index("ix_units_building_block_floor_number", "building_id", "block", "floor", "unit_number"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     building_id = Column(Integer, ForeignKey("buildings.id"), nullable=False)
@@ -131,8 +157,8 @@ class Unit(Base):
     is_occupied = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     building = relationship("Building", back_populates="units")
@@ -154,7 +180,7 @@ class User(Base):
     profile_image = Column(String(500))
     
     # Role and building association
-    role = Column(SQLEnum(UserRole), default=UserRole.RESIDENT)
+    role = Column(StringEnum(UserRole), default=UserRole.RESIDENT)
     building_id = Column(Integer, ForeignKey("buildings.id"), nullable=True)
     unit_id = Column(Integer, ForeignKey("units.id"), nullable=True)
     
@@ -165,12 +191,17 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
     
-    # Settings & Preferences
+    # Settings & Preferences; the frequently read ones are columns so they can be
+    # read (and filtered on) without parsing the settings blob
     settings = Column(JSON, default={})
+    locale = Column(String(8), default="en")
+    timezone = Column(String(32), default="UTC")
+    notifications_enabled = Column(Boolean, default=True)
+    push_token = Column(String(255), index=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     last_login = Column(DateTime)
     
     # Relationships
@@ -185,6 +216,25 @@ class User(Base):
 class Complaint(Base):
     """Maintenance complaints/issues"""
     __tablename__ = "complaints"
+    __table_args__ = (
+        # Keyset pagination order for a building's complaint list
+        Index("ix_complaints_building_created_at_id", "building_id", "created_at", "id"),
+        # Covers the dashboard count filters, so they can be answered from the index alone
+        Index("ix_complaints_building_status", "building_id", "status", "sla_deadline", "created_at"),
+        # Technician job lists and per-technician stats
+        Index("ix_complaints_assignee_status", "assigned_to_id", "status", "created_at"),
+        # Unscoped overdue counts (open and past deadline) across all buildings
+        Index("ix_complaints_sla_deadline", "sla_deadline", "status"),
+        # Trigram indexes let the ILIKE '%term%' search use an index (PostgreSQL only)
+        Index(
+            "ix_complaints_title_trgm", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_complaints_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     building_id = Column(Integer, ForeignKey("buildings.id"), nullable=False)
@@ -193,13 +243,13 @@ class Complaint(Base):
     # Complaint details
     title = Column(String(255), nullable=False)
     description = Column(Text)
-    category = Column(SQLEnum(ComplaintCategory), default=ComplaintCategory.OTHER)
-    priority = Column(SQLEnum(ComplaintPriority), default=ComplaintPriority.MEDIUM)
-    status = Column(SQLEnum(ComplaintStatus), default=ComplaintStatus.SUBMITTED)
+    category = Column(StringEnum(ComplaintCategory), default=ComplaintCategory.OTHER)
+    priority = Column(StringEnum(ComplaintPriority), default=ComplaintPriority.MEDIUM)
+    status = Column(StringEnum(ComplaintStatus), default=ComplaintStatus.SUBMITTED)
     
     # Media attachments (JSON array of file paths)
-    photos = Column(Text)  # JSON array
-    videos = Column(Text)  # JSON array
+    photos = Column(JSONDocument)  # JSON array
+    videos = Column(JSONDocument)  # JSON array
     
     # Assignment
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -207,8 +257,11 @@ class Complaint(Base):
     
     # SLA tracking
     sla_hours = Column(Integer, default=48)
-    sla_deadline = Column(DateTime)
-    is_sla_breached = Column(Boolean, default=False)
+    # Generated by the database, so it can never drift from created_at/sla_hours
+    sla_deadline = Column(
+        DateTime,
+        Computed(add_hours(literal_column("created_at"), literal_column("sla_hours")), persisted=True)
+    )
     
     # Visitor preferences
     preferred_visit_time = Column(DateTime)
@@ -223,8 +276,8 @@ class Complaint(Base):
     actual_cost = Column(Float, default=0.0)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     unit = relationship("Unit", back_populates="complaints")
@@ -232,26 +285,49 @@ class Complaint(Base):
     assigned_to = relationship("User", foreign_keys=[assigned_to_id])
     updates = relationship("ComplaintUpdate", back_populates="complaint", cascade="all, delete-orphan")
     vendor_quotes = relationship("VendorQuote", back_populates="complaint", cascade="all, delete-orphan")
+    
+    # Open and past its deadline; derived from the current time rather than
+    # stored, so it never needs a sweep to stay correct
+    @hybrid_property
+    def is_sla_breached(self) -> bool:
+        return (
+            self.sla_deadline is not None
+            and self.status not in SLA_STOPPED_STATUSES
+            and self.sla_deadline < datetime.utcnow()
+        )
+    
+    @is_sla_breached.inplace.expression
+    @classmethod
+    def _is_sla_breached_expression(cls):
+        return and_(
+            cls.sla_deadline.isnot(None),
+            cls.status.not_in(SLA_STOPPED_STATUSES),
+            cls.sla_deadline < utcnow()
+        )
 
 
 class ComplaintUpdate(Base):
     """Timeline updates for complaints"""
     __tablename__ = "complaint_updates"
+    __table_args__ = (
+        # A complaint's timeline, oldest first
+        Index("ix_complaint_updates_complaint_created_at", "complaint_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False)
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Update content
-    status = Column(SQLEnum(ComplaintStatus))
+    status = Column(StringEnum(ComplaintStatus))
     message = Column(Text)
-    photos = Column(Text)  # JSON array for before/after photos
+    photos = Column(JSONDocument)  # JSON array for before/after photos
     
     # Cost updates
     cost_update = Column(Float)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     # Relationships
     complaint = relationship("Complaint", back_populates="updates")
@@ -261,6 +337,20 @@ class ComplaintUpdate(Base):
 class Vendor(Base):
     """External vendors/contractors"""
     __tablename__ = "vendors"
+    __table_args__ = (
+        # Vendor list order (unrated as 0, highest first, id for keyset pages); the
+        # query must use the same inline coalesce(rating, 0.0) to match the index
+        Index("ix_vendors_active_rating_id", "is_active", text("coalesce(rating, 0.0)"), "id"),
+        # Trigram indexes let the ILIKE '%term%' search use an index (PostgreSQL only)
+        Index(
+            "ix_vendors_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_vendors_company_name_trgm", "company_name",
+            postgresql_using="gin", postgresql_ops={"company_name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -283,8 +373,8 @@ class Vendor(Base):
     is_active = Column(Boolean, default=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     quotes = relationship("VendorQuote", back_populates="vendor")
@@ -293,6 +383,10 @@ class Vendor(Base):
 class VendorQuote(Base):
     """Vendor quotes for complaints"""
     __tablename__ = "vendor_quotes"
+    __table_args__ = (
+        # A complaint's quotes, cheapest first
+        Index("ix_vendor_quotes_complaint_amount", "complaint_id", "amount"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False)
@@ -308,11 +402,11 @@ class VendorQuote(Base):
     quote_document = Column(String(500))  # PDF file path
     
     # Status
-    status = Column(SQLEnum(VendorQuoteStatus), default=VendorQuoteStatus.SUBMITTED)
+    status = Column(StringEnum(VendorQuoteStatus), default=VendorQuoteStatus.SUBMITTED)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     complaint = relationship("Complaint", back_populates="vendor_quotes")
@@ -339,14 +433,14 @@ class Facility(Base):
     advance_booking_days = Column(Integer, default=30)
     
     # Operating hours (JSON: {"monday": {"open": "08:00", "close": "22:00"}, ...})
-    operating_hours = Column(Text)
+    operating_hours = Column(JSONDocument)
     
     # Status
     is_active = Column(Boolean, default=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     building = relationship("Building", back_populates="facilities")
@@ -356,6 +450,15 @@ class Facility(Base):
 class FacilityBooking(Base):
     """Facility booking records"""
     __tablename__ = "facility_bookings"
+    __table_args__ = (
+        # Range seek for the overlapping-booking check
+        Index("ix_facility_bookings_facility_start", "facility_id", "start_time"),
+        # Booking list order (latest first, id for keyset pages) for a user's own
+        # bookings and for status-filtered admin views
+        Index("ix_facility_bookings_user_date_id", "user_id", "booking_date", "id"),
+        Index("ix_facility_bookings_status_date_id", "status", "booking_date", "id"),
+        CheckConstraint("end_time > start_time", name="positive_duration"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     facility_id = Column(Integer, ForeignKey("facilities.id"), nullable=False)
@@ -376,11 +479,11 @@ class FacilityBooking(Base):
     is_paid = Column(Boolean, default=False)
     
     # Status
-    status = Column(SQLEnum(BookingStatus), default=BookingStatus.PENDING)
+    status = Column(StringEnum(BookingStatus), default=BookingStatus.PENDING)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     facility = relationship("Facility", back_populates="bookings")
@@ -390,6 +493,12 @@ class FacilityBooking(Base):
 class Announcement(Base):
     """Building announcements"""
     __tablename__ = "announcements"
+    __table_args__ = (
+        # Keyset pagination order for the announcement feed
+        Index("ix_announcements_created_at_id", "created_at", "id"),
+        # Per-building feed filtered by publish state, newest first
+        Index("ix_announcements_building_published_created", "building_id", "is_published", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     building_id = Column(Integer, ForeignKey("buildings.id"), nullable=False)
@@ -398,10 +507,10 @@ class Announcement(Base):
     content = Column(Text, nullable=False)
     
     # Target audience (JSON array: ["all", "block_a", "committee"])
-    target_audience = Column(Text)
+    target_audience = Column(JSONDocument)
     
     # Attachments
-    attachments = Column(Text)  # JSON array of file paths
+    attachments = Column(JSONDocument)  # JSON array of file paths
     
     # Notification settings
     send_push = Column(Boolean, default=False)
@@ -413,8 +522,16 @@ class Announcement(Base):
     published_at = Column(DateTime)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     building = relationship("Building", back_populates="announcements")
+
+
+# gin_trgm_ops for the complaint and vendor search indexes
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
@@ -2,7 +2,7 @@
 FixMyCondo - Pydantic Schemas
 Request/Response models for API endpoints
 """
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter, validator, model_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -75,9 +75,8 @@ class VendorQuoteStatus(str, Enum):
 
 class BaseSchema(BaseModel):
     """Base schema with common config"""
-    class Config:
-        from_attributes = True
-        use_enum_values = True
+    # Instances are built once and never modified, so they are immutable
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True, frozen=True)
 
 
 # ============================================
@@ -140,6 +139,10 @@ class UserUpdate(BaseSchema):
     speciality: Optional[str] = None
     is_active: Optional[bool] = None
     settings: Optional[dict] = None
+    locale: Optional[str] = Field(None, max_length=8)
+    timezone: Optional[str] = Field(None, max_length=32)
+    notifications_enabled: Optional[bool] = None
+    push_token: Optional[str] = Field(None, max_length=255)
 
 
 class PasswordChange(BaseModel):
@@ -156,10 +159,21 @@ class UserResponse(UserBase):
     is_active: bool = True
     is_verified: bool = False
     settings: dict = {}
+    locale: Optional[str] = None
+    timezone: Optional[str] = None
+    notifications_enabled: bool = True
     created_at: datetime
     last_login: Optional[datetime] = None
 
 
+class PublicUserResponse(UserBase):
+    """Another user's public profile, as nested in bookings"""
+    id: int
+    is_active: bool = True
+    is_verified: bool = False
+    created_at: datetime
+
+
 class ResidenceResponse(BaseSchema):
     building_name: str
     building_address: Optional[str] = None
@@ -310,6 +324,10 @@ class ComplaintListResponse(BaseSchema):
     created_at: datetime
 
 
+# Validates a whole page of rows in one call instead of one model per row
+COMPLAINT_LIST_ADAPTER = TypeAdapter(List[ComplaintListResponse])
+
+
 # ============================================
 # COMPLAINT UPDATE SCHEMAS
 # ============================================
@@ -451,6 +469,17 @@ class FacilityBookingCreate(BaseSchema):
     end_time: datetime
     number_of_guests: int = 1
     purpose: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def check_time_range(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+    
+    @property
+    def duration_hours(self) -> float:
+        """Booked duration in hours"""
+        return (self.end_time - self.start_time).total_seconds() / 3600
 
 
 class FacilityBookingUpdate(BaseSchema):
@@ -473,7 +502,10 @@ class FacilityBookingResponse(BaseSchema):
     status: BookingStatus
     created_at: datetime
     facility: Optional[FacilityResponse] = None
-    user: Optional[UserResponse] = None
+    user: Optional[PublicUserResponse] = None
+
+
+FACILITY_BOOKING_LIST_ADAPTER = TypeAdapter(List[FacilityBookingResponse])
 
 
 # ============================================
@@ -555,7 +587,9 @@ class PaginationParams(BaseModel):
 class PaginatedResponse(BaseModel):
     """Paginated response wrapper"""
     items: List
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    has_next: Optional[bool] = None
+    next_cursor: Optional[str] = None
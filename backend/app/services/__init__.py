@@ -4,12 +4,15 @@ FixMyCondo - Services Package
 from .auth import (
     hash_password,
     verify_password,
+    verify_and_update_password,
     create_access_token,
     create_refresh_token,
     create_tokens,
     decode_token,
     get_current_user,
     get_current_active_user,
+    user_cache_key,
+    invalidate_user,
     require_roles,
     require_admin,
     require_committee,
@@ -17,13 +20,55 @@ from .auth import (
     require_resident
 )
 
+from .cache import (
+    get_redis,
+    close_redis,
+    statement_cache_key,
+    cache_get,
+    cache_set,
+    cache_delete,
+    cache_delete_pattern,
+    cache_get_or_compute,
+    dashboard_cache_key,
+    get_dashboard_generation,
+    cache_set_dashboard,
+    invalidate_dashboard_cache,
+    facilities_cache_key,
+    invalidate_facilities_cache,
+    facility_cache_key
+)
+
+from .dashboard_view import (
+    dashboard_view_enabled,
+    get_dashboard_view_counts,
+    refresh_dashboard_view,
+    schedule_dashboard_refresh
+)
+
+from .dashboard_stats import (
+    compute_dashboard_stats,
+    precompute_dashboard_stats,
+    start_dashboard_stats_refresher,
+    stop_dashboard_stats_refresher
+)
+
+from .pagination import (
+    encode_cursor,
+    decode_cursor,
+    cached_count
+)
+
+from .etag import (
+    make_etag,
+    etag_response
+)
+
 from .sla_engine import (
     get_sla_hours,
     calculate_sla_deadline,
     is_sla_breached,
     get_remaining_sla_time,
     get_sla_status,
-    check_and_update_sla_breaches,
     get_sla_compliance_stats
 )
 
@@ -31,23 +76,58 @@ __all__ = [
     # Auth
     "hash_password",
     "verify_password", 
+    "verify_and_update_password",
     "create_access_token",
     "create_refresh_token",
     "create_tokens",
     "decode_token",
     "get_current_user",
     "get_current_active_user",
+    "user_cache_key",
+    "invalidate_user",
     "require_roles",
     "require_admin",
     "require_committee",
     "require_technician",
     "require_resident",
+    # Cache
+    "get_redis",
+    "close_redis",
+    "statement_cache_key",
+    "cache_get",
+    "cache_set",
+    "cache_delete",
+    "cache_delete_pattern",
+    "cache_get_or_compute",
+    "dashboard_cache_key",
+    "get_dashboard_generation",
+    "cache_set_dashboard",
+    "invalidate_dashboard_cache",
+    "facilities_cache_key",
+    "invalidate_facilities_cache",
+    "facility_cache_key",
+    # Dashboard view
+    "dashboard_view_enabled",
+    "get_dashboard_view_counts",
+    "refresh_dashboard_view",
+    "schedule_dashboard_refresh",
+    # Dashboard stats
+    "compute_dashboard_stats",
+    "precompute_dashboard_stats",
+    "start_dashboard_stats_refresher",
+    "stop_dashboard_stats_refresher",
+    # Pagination
+    "encode_cursor",
+    "decode_cursor",
+    "cached_count",
+    # Conditional GET
+    "make_etag",
+    "etag_response",
     # SLA
     "get_sla_hours",
     "calculate_sla_deadline",
     "is_sla_breached",
     "get_remaining_sla_time",
     "get_sla_status",
-    "check_and_update_sla_breaches",
     "get_sla_compliance_stats"
 ]
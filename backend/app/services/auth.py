@@ -3,50 +3,112 @@ FixMyCondo - Authentication Service
 JWT token generation and password hashing
 """
 from datetime import datetime, timedelta
-from typing import Optional, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Tuple
+import asyncio
+import hashlib
+import os
+import time
+import bcrypt
+import jwt
+import orjson
+from jwt.exceptions import PyJWTError
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 
 from ..config import settings
 from ..database import get_db
 from ..models import User, UserRole
 from ..schemas import TokenPayload
+from .cache import cache_get, cache_set, cache_delete
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt only reads the first 72 bytes of a password
+_BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# bcrypt releases the GIL, so one thread per core hashes in parallel. A
+# dedicated pool keeps login bursts from queuing behind other to_thread work.
+_password_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+
+# Settings are read once at startup, so the token parameters are fixed too
+_JWT_SECRET_KEY = settings.JWT_SECRET_KEY
+_JWT_ALGORITHM = settings.JWT_ALGORITHM
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+_ACCESS_TOKEN_LIFETIME = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+_REFRESH_TOKEN_LIFETIME = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Verified token payloads by SHA-256 of the token, least recently used first
+_verified_tokens: "OrderedDict[bytes, TokenPayload]" = OrderedDict()
+
+# Cached user rows by id with their expiry, least recently used first. This
+# per-process tier sits in front of Redis, so changes made through another
+# worker show up here within USER_LOCAL_CACHE_TTL_SECONDS.
+_local_users: "OrderedDict[int, Tuple[float, str]]" = OrderedDict()
+
+
+def _hash_password_sync(password: str) -> str:
+    secret = password.encode()[:_BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.hashpw(secret, bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+
+
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    secret = plain_password.encode()[:_BCRYPT_MAX_PASSWORD_BYTES]
+    try:
+        return bcrypt.checkpw(secret, hashed_password.encode())
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def _verify_and_update_password_sync(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    if not _verify_password_sync(plain_password, hashed_password):
+        return False, None
+    # The cost is the third "$"-separated field, e.g. $2b$12$...
+    if int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS:
+        return True, _hash_password_sync(plain_password)
+    return True, None
+
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+async def _run_in_password_pool(func, *args):
+    """Run a bcrypt call on the password hashing threads"""
+    return await asyncio.get_running_loop().run_in_executor(_password_pool, func, *args)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt (off the event loop)"""
+    return await _run_in_password_pool(_hash_password_sync, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (off the event loop)"""
+    return await _run_in_password_pool(_verify_password_sync, plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, also returning a new hash when the stored one uses a different BCRYPT_ROUNDS"""
+    return await _run_in_password_pool(_verify_and_update_password_sync, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.utcnow() + (expires_delta or _ACCESS_TOKEN_LIFETIME)
     to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return jwt.encode(to_encode, _JWT_SECRET_KEY, algorithm=_JWT_ALGORITHM)
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT refresh token"""
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+    expire = datetime.utcnow() + (expires_delta or _REFRESH_TOKEN_LIFETIME)
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return jwt.encode(to_encode, _JWT_SECRET_KEY, algorithm=_JWT_ALGORITHM)
 
 
 def create_tokens(user: User) -> dict:
@@ -54,7 +116,7 @@ def create_tokens(user: User) -> dict:
     token_data = {
         "sub": str(user.id),
         "email": user.email,
-        "role": user.role.value if isinstance(user.role, UserRole) else user.role
+        "role": user.role.value
     }
     
     return {
@@ -64,25 +126,110 @@ def create_tokens(user: User) -> dict:
     }
 
 
-def decode_token(token: str) -> Optional[TokenPayload]:
-    """Decode and validate a JWT token"""
+def _verify_token(token: str) -> Optional[TokenPayload]:
+    """Verify a JWT signature and claims"""
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = jwt.decode(token, _JWT_SECRET_KEY, algorithms=_JWT_ALGORITHMS)
         return TokenPayload(
             sub=int(payload.get("sub")),
             email=payload.get("email"),
             role=payload.get("role"),
             exp=datetime.fromtimestamp(payload.get("exp"))
         )
-    except JWTError:
+    except PyJWTError:
+        return None
+
+
+def decode_token(token: str) -> Optional[TokenPayload]:
+    """Decode and validate a JWT token (verified payloads are reused until the token expires)"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _verified_tokens.get(key)
+    if payload is None:
+        payload = _verify_token(token)
+        # Failures are never cached, so a flood of bad tokens can't evict good ones
+        if payload is None:
+            return None
+        _verified_tokens[key] = payload
+        if len(_verified_tokens) > settings.JWT_DECODE_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    else:
+        _verified_tokens.move_to_end(key)
+    
+    if payload.exp.timestamp() < time.time():
+        del _verified_tokens[key]
         return None
+    return payload
+
+
+def user_cache_key(user_id: int) -> str:
+    """Cache key for an authenticated user row"""
+    return f"user:{user_id}"
+
+
+def _local_user_get(user_id: int) -> Optional[str]:
+    """A user row from this process's cache, if present and not expired"""
+    entry = _local_users.get(user_id)
+    if entry is None:
+        return None
+    expires_at, raw = entry
+    if expires_at < time.monotonic():
+        del _local_users[user_id]
+        return None
+    _local_users.move_to_end(user_id)
+    return raw
+
+
+def _local_user_set(user_id: int, raw: str) -> None:
+    """Keep a user row in this process's cache for USER_LOCAL_CACHE_TTL_SECONDS"""
+    if not settings.USER_LOCAL_CACHE_TTL_SECONDS:
+        return
+    _local_users[user_id] = (time.monotonic() + settings.USER_LOCAL_CACHE_TTL_SECONDS, raw)
+    _local_users.move_to_end(user_id)
+    if len(_local_users) > settings.USER_LOCAL_CACHE_SIZE:
+        _local_users.popitem(last=False)
+
+
+async def invalidate_user(user_id: int) -> None:
+    """Drop a user's cached row after it changes (this process and Redis)"""
+    _local_users.pop(user_id, None)
+    await cache_delete(user_cache_key(user_id))
+
+
+def _dump_user(user: User) -> str:
+    """Serialize a user row for the cache (the password hash is never cached)"""
+    # orjson writes datetimes as ISO 8601 and enums as their values
+    data = {
+        column.key: getattr(user, column.key)
+        for column in User.__table__.columns
+        if column.key != "hashed_password"
+    }
+    return orjson.dumps(data).decode()
+
+
+def _load_user(raw: str) -> User:
+    """Rebuild a detached User from its cached form"""
+    data = orjson.loads(raw)
+    for key in ("created_at", "updated_at", "last_login"):
+        if data.get(key):
+            data[key] = datetime.fromisoformat(data[key])
+    if data.get("role"):
+        data["role"] = UserRole(data["role"])
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get the current authenticated user from JWT token"""
+    # Reuse the user already resolved for this request
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -101,12 +248,30 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Get user from database
-    result = await db.execute(select(User).where(User.id == payload.sub))
-    user = result.scalar_one_or_none()
-    
-    if user is None:
-        raise credentials_exception
+    # Get user from this process's cache, then Redis, falling back to the database
+    cached = _local_user_get(payload.sub)
+    if cached:
+        user = _load_user(cached)
+        db.add(user)
+    else:
+        cached = await cache_get(user_cache_key(payload.sub))
+        if cached:
+            user = _load_user(cached)
+            db.add(user)
+        else:
+            result = await db.execute(select(User).where(User.id == payload.sub))
+            user = result.scalar_one_or_none()
+            
+            if user is None:
+                raise credentials_exception
+            
+            cached = _dump_user(user)
+            await cache_set(
+                user_cache_key(payload.sub),
+                cached,
+                ttl=min(settings.CACHE_TTL_SECONDS, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+            )
+        _local_user_set(payload.sub, cached)
     
     if not user.is_active:
         raise HTTPException(
@@ -114,6 +279,7 @@ async def get_current_user(
             detail="User account is disabled"
         )
     
+    request.state.current_user = user
     return user
 
 
@@ -129,12 +295,14 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 
 def require_roles(*roles: UserRole):
     """Dependency factory for role-based access control"""
+    allowed = frozenset(roles)
+    denied_detail = f"Access denied. Required roles: {[r.value for r in roles]}"
+    
     async def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        user_role = current_user.role if isinstance(current_user.role, UserRole) else UserRole(current_user.role)
-        if user_role not in roles:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required roles: {[r.value for r in roles]}"
+                detail=denied_detail
             )
         return current_user
     return role_checker
@@ -0,0 +1,243 @@
+"""
+FixMyCondo - Cache Service
+Redis look-aside cache for hot read paths
+"""
+from typing import Awaitable, Callable, Optional
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import time
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError, WatchError
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared client, created lazily on first use
+_redis: Optional[aioredis.Redis] = None
+
+# How often a caller waiting on another's recompute checks for the result
+_LOCK_POLL_SECONDS = 0.1
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """Get the shared Redis client, or None when REDIS_URL is not configured"""
+    global _redis
+    if not settings.REDIS_URL:
+        return None
+    if _redis is None:
+        _redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client (called on application shutdown)"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def statement_cache_key(prefix: str, statement) -> str:
+    """Cache key derived from a statement's SQL and bound parameters"""
+    compiled = statement.compile()
+    digest = hashlib.md5(f"{compiled}|{sorted(compiled.params.items())}".encode()).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """Get a cached value; a miss, a disabled cache and a Redis error all return None"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.get(key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+async def cache_set(key: str, value: str, ttl: Optional[int] = None) -> None:
+    """Store a value with a TTL (defaults to CACHE_TTL_SECONDS)"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, value, ex=ttl or settings.CACHE_TTL_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+async def cache_delete(*keys: str) -> None:
+    """Invalidate one or more cached keys"""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        await client.delete(*keys)
+    except RedisError as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+
+async def cache_delete_pattern(pattern: str) -> None:
+    """Invalidate every key matching a glob pattern (SCAN-based, never KEYS)"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            async for key in client.scan_iter(match=pattern, count=500):
+                pipe.delete(key)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Cache invalidation failed for {pattern}: {e}")
+
+
+async def _compute_and_store(
+    client: aioredis.Redis, key: str, compute: Callable[[], Awaitable[str]], ttl: int
+) -> str:
+    """Run compute while holding the key's lock, then store the value and its compute time"""
+    started = time.monotonic()
+    try:
+        value = await compute()
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=ttl)
+            pipe.set(f"{key}:delta", elapsed_ms, ex=ttl)
+            await pipe.execute()
+        return value
+    finally:
+        try:
+            await client.delete(f"lock:{key}")
+        except RedisError as e:
+            logger.warning(f"Cache lock release failed for {key}: {e}")
+
+
+async def cache_get_or_compute(
+    key: str, compute: Callable[[], Awaitable[str]], ttl: Optional[int] = None
+) -> str:
+    """Get a cached value, letting only one caller at a time recompute it (stampede-safe)"""
+    ttl = ttl or settings.CACHE_TTL_SECONDS
+    client = get_redis()
+    if client is None:
+        return await compute()
+    
+    lock_key = f"lock:{key}"
+    lock_timeout = settings.CACHE_LOCK_TIMEOUT_SECONDS
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            pipe.get(f"{key}:delta")
+            value, ttl_ms, delta_ms = await pipe.execute()
+        
+        if value is not None:
+            # XFetch: refresh early at random, more likely the nearer the expiry
+            # and the longer the value took to compute
+            delta = float(delta_ms or 0)
+            early = -delta * settings.CACHE_EARLY_REFRESH_BETA * math.log(1.0 - random.random())
+            if ttl_ms < 0 or early < ttl_ms:
+                return value
+            # Refresh ahead of expiry if nobody else is; everyone else keeps the current value
+            if await client.set(lock_key, 1, nx=True, ex=lock_timeout):
+                return await _compute_and_store(client, key, compute, ttl)
+            return value
+        
+        # Miss: one caller computes, the rest poll for its result until the lock would expire
+        for _ in range(int(lock_timeout / _LOCK_POLL_SECONDS)):
+            if await client.set(lock_key, 1, nx=True, ex=lock_timeout):
+                return await _compute_and_store(client, key, compute, ttl)
+            await asyncio.sleep(_LOCK_POLL_SECONDS)
+            value = await client.get(key)
+            if value is not None:
+                return value
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+    
+    return await compute()
+
+
+def dashboard_cache_key(building_id: Optional[int], *parts) -> str:
+    """Cache key for a dashboard aggregate, scoped by building ("all" when unscoped)"""
+    return ":".join(["dash", str(building_id or "all"), *map(str, parts)])
+
+
+def dashboard_generation_key(building_id: Optional[int]) -> str:
+    """Key of the counter bumped whenever a building's dashboard aggregates are invalidated"""
+    return f"dashgen:{building_id or 'all'}"
+
+
+async def get_dashboard_generation(building_id: Optional[int]) -> Optional[str]:
+    """Current dashboard generation of a building; None when it cannot be read"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.get(dashboard_generation_key(building_id)) or "0"
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {dashboard_generation_key(building_id)}: {e}")
+        return None
+
+
+async def cache_set_dashboard(
+    building_id: Optional[int], key: str, value: str, ttl: int, generation: Optional[str]
+) -> None:
+    """Store a dashboard aggregate unless it was invalidated since `generation` was read"""
+    client = get_redis()
+    if client is None or generation is None:
+        return
+    generation_key = dashboard_generation_key(building_id)
+    try:
+        # WATCH makes the write fail if an invalidation bumps the generation
+        # between the check and the SET, so stats read before a write never
+        # land in the cache after it
+        async with client.pipeline(transaction=True) as pipe:
+            await pipe.watch(generation_key)
+            if (await pipe.get(generation_key) or "0") != generation:
+                return
+            pipe.multi()
+            pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+    except WatchError:
+        pass
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+async def invalidate_dashboard_cache(building_id: Optional[int]) -> None:
+    """Drop cached dashboard aggregates for a building and the unscoped totals"""
+    client = get_redis()
+    if client is not None:
+        # Bumped before the delete, so computations already in flight cannot store their results
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.incr(dashboard_generation_key(building_id))
+                if building_id:
+                    pipe.incr(dashboard_generation_key(None))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Dashboard generation bump failed for {building_id}: {e}")
+    await cache_delete_pattern(dashboard_cache_key(building_id, "*"))
+    if building_id:
+        await cache_delete_pattern(dashboard_cache_key(None, "*"))
+
+
+def facilities_cache_key(building_id: Optional[int], is_active: bool) -> str:
+    """Cache key for a facility list, scoped by building ("all" when unscoped)"""
+    return f"facilities:{building_id or 'all'}:{is_active}"
+
+
+async def invalidate_facilities_cache(building_id: Optional[int]) -> None:
+    """Drop cached facility lists for a building and the unscoped lists"""
+    await cache_delete_pattern(f"facilities:{building_id or 'all'}:*")
+    if building_id:
+        await cache_delete_pattern("facilities:all:*")
+
+
+def facility_cache_key(facility_id: int) -> str:
+    """Cache key for a single facility record"""
+    return f"facility:{facility_id}"
@@ -0,0 +1,178 @@
+"""
+FixMyCondo - Dashboard Stats Service
+Per-building dashboard aggregates, precomputed into Redis in the background
+"""
+from datetime import datetime
+from typing import Optional
+import asyncio
+import logging
+
+from redis.exceptions import RedisError
+from sqlalchemy import select, func, and_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import async_session, one_in_new_session, scalar_in_new_session
+from ..models import (
+    Complaint, User, Unit, Building, FacilityBooking,
+    ComplaintStatus, BookingStatus, UserRole
+)
+from ..schemas import DashboardStats
+from .cache import get_redis, dashboard_cache_key, get_dashboard_generation, cache_set_dashboard
+from .dashboard_view import dashboard_view_enabled, get_dashboard_view_counts
+
+logger = logging.getLogger(__name__)
+
+_IN_PROGRESS_STATUSES = (
+    ComplaintStatus.ASSIGNED,
+    ComplaintStatus.IN_PROGRESS,
+    ComplaintStatus.PENDING_PARTS,
+    ComplaintStatus.PENDING_VENDOR
+)
+
+# Held by whichever worker runs the current refresh round
+_REFRESH_LOCK_KEY = "lock:dash:precompute"
+
+_refresher_task: Optional[asyncio.Task] = None
+
+
+async def _complaint_counts(db: AsyncSession, complaint_query, building_id: Optional[int]):
+    """Complaint counts from the materialized view where available, else counted live"""
+    if dashboard_view_enabled():
+        counts = await get_dashboard_view_counts(db, building_id)
+        if counts is not None:
+            return counts
+    
+    result = await db.execute(complaint_query)
+    return result.one()
+
+
+async def compute_dashboard_stats(db: AsyncSession, building_id: Optional[int]) -> DashboardStats:
+    """Aggregate the dashboard statistics for a building (all buildings when None)"""
+    today = datetime.utcnow().date()
+    today_start = datetime.combine(today, datetime.min.time())
+    today_end = datetime.combine(today, datetime.max.time())
+    
+    # Complaint stats, all counted in one scan with FILTER clauses
+    complaint_query = select(
+        func.count().label("total"),
+        func.count().filter(Complaint.status == ComplaintStatus.SUBMITTED).label("new"),
+        func.count().filter(Complaint.status.in_(_IN_PROGRESS_STATUSES)).label("in_progress"),
+        func.count().filter(Complaint.is_sla_breached).label("overdue"),
+        func.count().filter(
+            and_(
+                Complaint.status.in_([ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED]),
+                Complaint.resolved_at >= today_start,
+                Complaint.resolved_at <= today_end
+            )
+        ).label("completed_today")
+    ).select_from(Complaint)
+    if building_id:
+        complaint_query = complaint_query.where(Complaint.building_id == building_id)
+    
+    # Resident/Unit stats
+    unit_query = select(
+        func.count().label("total"),
+        func.count().filter(Unit.is_occupied == True).label("occupied")
+    ).select_from(Unit)
+    if building_id:
+        unit_query = unit_query.where(Unit.building_id == building_id)
+    
+    # Resident count
+    resident_filters = [User.role == UserRole.RESIDENT]
+    if building_id:
+        resident_filters.append(User.building_id == building_id)
+    resident_query = select(func.count()).select_from(User).where(and_(*resident_filters))
+    
+    # Booking stats
+    booking_query = select(
+        func.count().filter(
+            FacilityBooking.status == BookingStatus.PENDING
+        ).label("pending"),
+        func.count().filter(
+            and_(
+                FacilityBooking.booking_date >= today_start,
+                FacilityBooking.booking_date <= today_end,
+                FacilityBooking.status == BookingStatus.CONFIRMED
+            )
+        ).label("today")
+    ).select_from(FacilityBooking)
+    
+    # The queries are independent, so run them concurrently on separate sessions
+    complaint_counts, unit_counts, total_residents, booking_counts = await asyncio.gather(
+        _complaint_counts(db, complaint_query, building_id),
+        one_in_new_session(unit_query),
+        scalar_in_new_session(resident_query),
+        one_in_new_session(booking_query)
+    )
+    
+    return DashboardStats(
+        total_complaints=complaint_counts.total,
+        new_complaints=complaint_counts.new,
+        in_progress_complaints=complaint_counts.in_progress,
+        overdue_complaints=complaint_counts.overdue,
+        completed_today=complaint_counts.completed_today,
+        total_residents=total_residents or 0,
+        total_units=unit_counts.total,
+        occupied_units=unit_counts.occupied,
+        pending_bookings=booking_counts.pending,
+        today_bookings=booking_counts.today
+    )
+
+
+async def precompute_dashboard_stats() -> None:
+    """Compute and cache the dashboard stats of every active building and the unscoped totals"""
+    interval = settings.DASHBOARD_PRECOMPUTE_INTERVAL_SECONDS
+    async with async_session() as db:
+        result = await db.execute(select(Building.id).where(Building.is_active == True))
+        building_ids = [None, *result.scalars().all()]
+        
+        for building_id in building_ids:
+            # Read first, so a write landing mid-round keeps its invalidation
+            generation = await get_dashboard_generation(building_id)
+            stats = await compute_dashboard_stats(db, building_id)
+            # Outlives the interval so readers never fall through between rounds
+            await cache_set_dashboard(
+                building_id, dashboard_cache_key(building_id, "stats"), stats.model_dump_json(),
+                ttl=interval * 2, generation=generation
+            )
+
+
+async def _run_refresher() -> None:
+    interval = settings.DASHBOARD_PRECOMPUTE_INTERVAL_SECONDS
+    while True:
+        try:
+            # One worker per interval does the round; the rest skip it
+            if await get_redis().set(_REFRESH_LOCK_KEY, 1, nx=True, ex=interval):
+                await precompute_dashboard_stats()
+        except asyncio.CancelledError:
+            raise
+        except (SQLAlchemyError, RedisError) as e:
+            logger.warning(f"Dashboard stats precompute failed: {e}")
+        except Exception:
+            # Nothing restarts this task, so an unexpected error must not end it
+            logger.exception("Dashboard stats precompute failed unexpectedly")
+        await asyncio.sleep(interval)
+
+
+def start_dashboard_stats_refresher() -> None:
+    """Start precomputing dashboard stats every DASHBOARD_PRECOMPUTE_INTERVAL_SECONDS"""
+    global _refresher_task
+    if not settings.DASHBOARD_PRECOMPUTE_INTERVAL_SECONDS or get_redis() is None:
+        return
+    if _refresher_task is None or _refresher_task.done():
+        _refresher_task = asyncio.create_task(_run_refresher())
+
+
+async def stop_dashboard_stats_refresher() -> None:
+    """Cancel the background precompute (called on application shutdown)"""
+    global _refresher_task
+    if _refresher_task is None:
+        return
+    _refresher_task.cancel()
+    try:
+        await _refresher_task
+    except asyncio.CancelledError:
+        pass
+    _refresher_task = None
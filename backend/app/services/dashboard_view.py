@@ -0,0 +1,140 @@
+"""
+FixMyCondo - Dashboard View Service
+Per-building complaint counts precomputed in a PostgreSQL materialized view
+"""
+from datetime import datetime
+from typing import Optional
+import asyncio
+import logging
+
+from sqlalchemy import DDL, event, select, func, text, table, column, Integer, DateTime
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import Base, engine
+from .cache import cache_delete_pattern
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_VIEW = "mv_building_dashboard"
+
+# Timestamps are stored as naive UTC, so "today" is the UTC date at refresh time
+_CREATE_VIEW = DDL(f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {DASHBOARD_VIEW} AS
+SELECT
+    building_id,
+    count(*) AS total,
+    count(*) FILTER (WHERE status = 'SUBMITTED') AS new,
+    count(*) FILTER (
+        WHERE status IN ('ASSIGNED', 'IN_PROGRESS', 'PENDING_PARTS', 'PENDING_VENDOR')
+    ) AS in_progress,
+    count(*) FILTER (
+        WHERE status NOT IN ('COMPLETED', 'CLOSED', 'CANCELLED')
+        AND sla_deadline < now() AT TIME ZONE 'utc'
+    ) AS overdue,
+    count(*) FILTER (
+        WHERE status IN ('COMPLETED', 'CLOSED')
+        AND resolved_at >= (now() AT TIME ZONE 'utc')::date
+        AND resolved_at < (now() AT TIME ZONE 'utc')::date + 1
+    ) AS completed_today,
+    -- When the next open complaint goes overdue, after which overdue is stale
+    min(sla_deadline) FILTER (
+        WHERE status NOT IN ('COMPLETED', 'CLOSED', 'CANCELLED')
+        AND sla_deadline >= now() AT TIME ZONE 'utc'
+    ) AS next_breach_at,
+    now() AT TIME ZONE 'utc' AS refreshed_at
+FROM complaints
+GROUP BY building_id
+""")
+
+# REFRESH ... CONCURRENTLY needs a unique index on the view
+_CREATE_VIEW_INDEX = DDL(
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{DASHBOARD_VIEW}_building_id ON {DASHBOARD_VIEW} (building_id)"
+)
+
+_DROP_VIEW = DDL(f"DROP MATERIALIZED VIEW IF EXISTS {DASHBOARD_VIEW}")
+
+event.listen(Base.metadata, "after_create", _CREATE_VIEW.execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "after_create", _CREATE_VIEW_INDEX.execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "before_drop", _DROP_VIEW.execute_if(dialect="postgresql"))
+
+dashboard_view = table(
+    DASHBOARD_VIEW,
+    column("building_id", Integer),
+    column("total", Integer),
+    column("new", Integer),
+    column("in_progress", Integer),
+    column("overdue", Integer),
+    column("completed_today", Integer),
+    column("next_breach_at", DateTime),
+    column("refreshed_at", DateTime)
+)
+
+# Debounced refresh shared by every write in this process
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_pending = False
+
+
+def dashboard_view_enabled() -> bool:
+    """Whether the database backend supports the dashboard materialized view"""
+    return engine.dialect.name == "postgresql"
+
+
+async def get_dashboard_view_counts(db: AsyncSession, building_id: Optional[int]):
+    """Complaint counts from the materialized view, or None when they have gone stale"""
+    query = select(
+        func.coalesce(func.sum(dashboard_view.c.total), 0).label("total"),
+        func.coalesce(func.sum(dashboard_view.c.new), 0).label("new"),
+        func.coalesce(func.sum(dashboard_view.c.in_progress), 0).label("in_progress"),
+        func.coalesce(func.sum(dashboard_view.c.overdue), 0).label("overdue"),
+        func.coalesce(func.sum(dashboard_view.c.completed_today), 0).label("completed_today"),
+        func.min(dashboard_view.c.next_breach_at).label("next_breach_at"),
+        func.min(dashboard_view.c.refreshed_at).label("refreshed_at")
+    )
+    if building_id:
+        query = query.where(dashboard_view.c.building_id == building_id)
+    
+    counts = (await db.execute(query)).one()
+    
+    # overdue and completed_today are frozen at refresh time, so the view goes
+    # stale once a deadline passes or the day rolls over, even without writes
+    now = datetime.utcnow()
+    deadline_passed = counts.next_breach_at is not None and counts.next_breach_at <= now
+    if deadline_passed or (counts.refreshed_at and counts.refreshed_at.date() < now.date()):
+        schedule_dashboard_refresh()
+        return None
+    
+    return counts
+
+
+async def refresh_dashboard_view() -> None:
+    """Recompute the dashboard materialized view without blocking readers"""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {DASHBOARD_VIEW}"))
+    
+    # Cached stats were built from the previous refresh
+    await cache_delete_pattern("dash:*:stats")
+
+
+async def _refresh_after_delay() -> None:
+    global _refresh_pending
+    # Writes landing while a refresh runs may not be in it, so go round again
+    while _refresh_pending:
+        await asyncio.sleep(settings.DASHBOARD_VIEW_REFRESH_DELAY_SECONDS)
+        _refresh_pending = False
+        try:
+            await refresh_dashboard_view()
+        except SQLAlchemyError as e:
+            logger.warning(f"Dashboard view refresh failed: {e}")
+
+
+def schedule_dashboard_refresh() -> None:
+    """Refresh the dashboard view shortly, coalescing a burst of writes into one refresh"""
+    global _refresh_task, _refresh_pending
+    if not dashboard_view_enabled():
+        return
+    _refresh_pending = True
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_after_delay())
@@ -0,0 +1,25 @@
+"""
+FixMyCondo - Conditional GET Helpers
+ETag / If-None-Match handling for single-resource endpoints
+"""
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(body: str) -> str:
+    """Strong ETag for a serialized response body"""
+    return f'"{hashlib.md5(body.encode()).hexdigest()}"'
+
+
+def etag_response(request: Request, body: str) -> Response:
+    """JSON response tagged with an ETag, or an empty 304 when the client's copy is current"""
+    etag = make_etag(body)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
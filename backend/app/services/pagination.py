@@ -0,0 +1,58 @@
+"""
+FixMyCondo - Pagination Helpers
+Opaque keyset cursors and cached totals for list endpoints
+"""
+from datetime import datetime
+from typing import Any, Optional
+import base64
+import binascii
+
+import orjson
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import scalar_in_new_session
+from .cache import statement_cache_key, cache_get, cache_set
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort-key values of the last row on a page into an opaque cursor"""
+    # orjson writes datetimes in ISO 8601, which decode_cursor parses back
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decode a cursor back into sort-key values, coercing each to the given type"""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor arity mismatch")
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(values, types)
+        )
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+async def cached_count(db: Optional[AsyncSession], prefix: str, count_query) -> int:
+    """Run a COUNT query, caching large totals briefly per filter set (db=None: on its own session)"""
+    cache_key = statement_cache_key(prefix, count_query)
+    cached_total = await cache_get(cache_key)
+    if cached_total is not None:
+        return int(cached_total)
+    
+    # Without a session the COUNT can overlap a query on the request's session
+    if db is None:
+        total = await scalar_in_new_session(count_query)
+    else:
+        total = (await db.execute(count_query)).scalar()
+    # Small totals are cheap to recount and would go visibly stale, so only cache big ones
+    if total >= settings.COUNT_CACHE_MIN_ROWS:
+        await cache_set(cache_key, str(total), ttl=settings.COUNT_CACHE_TTL_SECONDS)
+    return total
@@ -0,0 +1,19 @@
+"""
+FixMyCondo - Gunicorn Configuration
+Production process manager running uvicorn workers
+
+Run with: gunicorn app.main:app -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '9030')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Workers read this as settings.WORKERS to size their connection pools
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Let in-flight requests finish on restart
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
@@ -1,12 +1,18 @@
-import os
-import sys
-import subprocess
+import asyncio
+import contextlib
+import io
+import traceback
 
-with open("seed_output.txt", "w", encoding="utf-8") as f:
+from seed_data import seed_database
+
+stdout, stderr = io.StringIO(), io.StringIO()
+with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
     try:
-        result = subprocess.run([sys.executable, "seed_data.py"], capture_output=True, text=True, encoding="utf-8")
-        f.write(result.stdout)
-        f.write("\nSTDERR:\n")
-        f.write(result.stderr)
-    except Exception as e:
-        f.write(str(e))
+        asyncio.run(seed_database())
+    except Exception:
+        traceback.print_exc()
+
+with open("seed_output.txt", "w", encoding="utf-8") as f:
+    f.write(stdout.getvalue())
+    f.write("\nSTDERR:\n")
+    f.write(stderr.getvalue())
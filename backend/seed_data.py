@@ -5,6 +5,7 @@ Creates synthetic users, buildings, units, complaints, and test data
 import asyncio
 import random
 from datetime import datetime, timedelta
+from sqlalchemy import Row, insert, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import async_session, create_tables
 from app.models import (
@@ -14,16 +15,18 @@ from app.models import (
     BookingStatus, VendorQuoteStatus
 )
 from app.services.auth import hash_password
-from app.services.sla_engine import calculate_sla_deadline, get_sla_hours
-import json
+from app.services.sla_engine import get_sla_hours
 
 
 # ============================================
 # SYNTHETIC PERSONAS
 # ============================================
 
+# Demo login passwords, shared by every account of a kind
+SEED_PASSWORDS = ("Admin@123", "Tech@123", "User@123")
+
 PERSONAS = {
-    "residents": [
+    "residents": (
         {
             "name": "Ahmad Bin Hassan",
             "email": "ahmad.hassan@gmail.com",
@@ -84,8 +87,8 @@ PERSONAS = {
             "phone": "019-901-2345",
             "persona": "Community volunteer, active in resident committee, reports on behalf of others"
         }
-    ],
-    "technicians": [
+    ),
+    "technicians": (
         {
             "name": "Raju Krishnan",
             "email": "raju.tech@fixmycondo.com",
@@ -107,8 +110,8 @@ PERSONAS = {
             "speciality": "General Maintenance, Carpentry",
             "persona": "Jack of all trades, quick fixes, good with residents"
         }
-    ],
-    "admins": [
+    ),
+    "admins": (
         {
             "name": "Jennifer Lee",
             "email": "jennifer.lee@condomanagement.com",
@@ -121,8 +124,8 @@ PERSONAS = {
             "phone": "012-888-7777",
             "persona": "Assistant manager, handles daily operations, tech-savvy"
         }
-    ],
-    "vendors": [
+    ),
+    "vendors": (
         {
             "name": "Ah Seng",
             "company": "Ah Seng Plumbing Services",
@@ -163,14 +166,14 @@ PERSONAS = {
             "service": "Pest Control",
             "persona": "Licensed pest control, eco-friendly options available"
         }
-    ]
+    )
 }
 
 # ============================================
 # SAMPLE COMPLAINTS
 # ============================================
 
-SAMPLE_COMPLAINTS = [
+SAMPLE_COMPLAINTS = (
     {
         "title": "Water leaking from ceiling in bathroom",
         "description": "There is water dripping from the ceiling in my master bathroom. It seems to be coming from the unit above. The leak started 2 days ago and is getting worse. Please send someone urgently.",
@@ -261,13 +264,13 @@ SAMPLE_COMPLAINTS = [
         "category": ComplaintCategory.COMMON_AREA,
         "priority": ComplaintPriority.HIGH
     }
-]
+)
 
 # ============================================
 # SAMPLE ANNOUNCEMENTS
 # ============================================
 
-SAMPLE_ANNOUNCEMENTS = [
+SAMPLE_ANNOUNCEMENTS = (
     {
         "title": "Water Supply Interruption - 25th December 2024",
         "content": """Dear Residents,
@@ -361,13 +364,13 @@ Please quote your unit number as reference.
 
 Thank you for your prompt payment."""
     }
-]
+)
 
 # ============================================
 # FACILITIES
 # ============================================
 
-SAMPLE_FACILITIES = [
+SAMPLE_FACILITIES = (
     {
         "name": "Swimming Pool",
         "description": "Olympic-sized swimming pool with children's wading area",
@@ -448,18 +451,27 @@ SAMPLE_FACILITIES = [
         "min_booking_hours": 1,
         "max_booking_hours": 2
     }
-]
+)
 
 from app.database import async_session, create_tables, drop_tables
 
 async def seed_database():
     """Main function to seed the database with test data"""
+    # Hash the demo passwords on the password threads while the tables are built
+    password_hashes = asyncio.create_task(hash_seed_passwords())
+    
     print("Dropping existing tables...")
     await drop_tables()
     print("Creating database tables...")
     await create_tables()
     
-    async with async_session() as db:
+    # One transaction for the whole seed: committed once at the end, rolled back on failure
+    async with async_session.begin() as db:
+        # Throwaway seed data need not wait on the WAL flush at commit; being
+        # LOCAL, the setting ends with this transaction
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(text("SET LOCAL synchronous_commit = off"))
+        
         print("\nCreating Buildings...")
         buildings = await create_buildings(db)
         
@@ -467,7 +479,7 @@ async def seed_database():
         units = await create_units(db, buildings)
         
         print("\nCreating Users...")
-        users = await create_users(db, buildings, units)
+        users = await create_users(db, buildings, units, await password_hashes)
         
         print("\nCreating Vendors...")
         vendors = await create_vendors(db)
@@ -486,13 +498,27 @@ async def seed_database():
         
         print("\nCreating Facility Bookings...")
         await create_bookings(db, facilities, users)
-        
-        await db.commit()
-        
+    
     print("\nDatabase seeding completed!")
     print_summary()
 
 
+async def hash_seed_passwords() -> dict:
+    """Hash each demo password once, all at the same time (bcrypt releases the GIL)"""
+    hashes = await asyncio.gather(*(hash_password(password) for password in SEED_PASSWORDS))
+    return dict(zip(SEED_PASSWORDS, hashes))
+
+
+async def insert_returning(db: AsyncSession, model, rows: list, *columns) -> list:
+    """Insert all rows of a model in one batched statement, returning the given columns of each new row in order"""
+    # Later steps only read a few columns, so plain rows are returned rather
+    # than ORM instances loaded into the session
+    result = await db.execute(
+        insert(model).returning(*columns, sort_by_parameter_order=True), rows
+    )
+    return result.all()
+
+
 async def create_buildings(db: AsyncSession) -> list:
     """Create sample buildings"""
     buildings_data = [
@@ -526,95 +552,88 @@ async def create_buildings(db: AsyncSession) -> list:
         }
     ]
     
-    buildings = []
-    for data in buildings_data:
-        building = Building(**data)
-        db.add(building)
-        buildings.append(building)
-    
-    await db.flush()
-    for b in buildings:
-        print(f"  - Created: {b.name} ({b.total_units} units)")
+    buildings = await insert_returning(
+        db, Building, buildings_data,
+        Building.id, Building.name, Building.total_blocks, Building.total_units
+    )
+    print("\n".join(f"  - Created: {b.name} ({b.total_units} units)" for b in buildings))
     
     return buildings
 
 
 async def create_units(db: AsyncSession, buildings: list) -> list:
     """Create sample units for each building"""
-    units = []
+    rows = []
     blocks = ["A", "B", "C"]
     
     for building in buildings:
         for block in blocks[:building.total_blocks]:
             for floor in range(1, 11):  # 10 floors
                 for unit_num in range(1, 4):  # 3 units per floor
-                    unit = Unit(
-                        building_id=building.id,
-                        unit_number=f"{floor:02d}-{unit_num:02d}",
-                        block=f"Block {block}",
-                        floor=floor,
-                        unit_type=random.choice(["Studio", "1BR", "2BR", "3BR"]),
-                        size_sqft=random.randint(500, 1500),
-                        is_occupied=random.random() > 0.1  # 90% occupied
-                    )
-                    db.add(unit)
-                    units.append(unit)
-    
-    await db.flush()
+                    rows.append({
+                        "building_id": building.id,
+                        "unit_number": f"{floor:02d}-{unit_num:02d}",
+                        "block": f"Block {block}",
+                        "floor": floor,
+                        "unit_type": random.choice(["Studio", "1BR", "2BR", "3BR"]),
+                        "size_sqft": random.randint(500, 1500),
+                        "is_occupied": random.random() > 0.1  # 90% occupied
+                    })
+    
+    units = await insert_returning(
+        db, Unit, rows,
+        Unit.id, Unit.building_id, Unit.unit_number, Unit.is_occupied
+    )
     print(f"  - Created {len(units)} units across {len(buildings)} buildings")
     return units
 
 
-async def create_users(db: AsyncSession, buildings: list, units: list) -> dict:
+async def create_users(db: AsyncSession, buildings: list, units: list, password_hashes: dict) -> dict:
     """Create synthetic users based on personas"""
-    users = {"residents": [], "technicians": [], "admins": []}
+    rows = []
+    created = []
     
     # Create super admin
-    super_admin = User(
-        email="admin@fixmycondo.com",
-        hashed_password=hash_password("Admin@123"),
-        full_name="Super Admin",
-        phone="012-000-0000",
-        role=UserRole.SUPER_ADMIN,
-        is_active=True,
-        is_verified=True
-    )
-    db.add(super_admin)
-    print(f"  - Super Admin: admin@fixmycondo.com / Admin@123")
+    rows.append({
+        "email": "admin@fixmycondo.com",
+        "hashed_password": password_hashes["Admin@123"],
+        "full_name": "Super Admin",
+        "phone": "012-000-0000",
+        "role": UserRole.SUPER_ADMIN,
+        "is_active": True,
+        "is_verified": True
+    })
+    created.append(f"  - Super Admin: admin@fixmycondo.com / Admin@123")
     
     # Create building admins
     for i, persona in enumerate(PERSONAS["admins"]):
         building = buildings[i % len(buildings)]
-        admin = User(
-            email=persona["email"],
-            hashed_password=hash_password("Admin@123"),
-            full_name=persona["name"],
-            phone=persona["phone"],
-            role=UserRole.BUILDING_ADMIN,
-            building_id=building.id,
-            is_active=True,
-            is_verified=True
-        )
-        db.add(admin)
-        users["admins"].append(admin)
-        print(f"  - Admin: {persona['email']} / Admin@123")
+        rows.append({
+            "email": persona["email"],
+            "hashed_password": password_hashes["Admin@123"],
+            "full_name": persona["name"],
+            "phone": persona["phone"],
+            "role": UserRole.BUILDING_ADMIN,
+            "building_id": building.id,
+            "is_active": True,
+            "is_verified": True
+        })
+        created.append(f"  - Admin: {persona['email']} / Admin@123")
     
     # Create technicians
     for persona in PERSONAS["technicians"]:
-        tech = User(
-            email=persona["email"],
-            hashed_password=hash_password("Tech@123"),
-            full_name=persona["name"],
-            phone=persona["phone"],
-            role=UserRole.TECHNICIAN,
-            building_id=buildings[0].id,
-            speciality=persona["speciality"],
-            is_active=True,
-            is_verified=True
-        )
-        db.add(tech)
-        users["technicians"].append(tech)
-        print(f"  - Technician: {persona['email']} / Tech@123")
+        rows.append({
+            "email": persona["email"],
+            "hashed_password": password_hashes["Tech@123"],
+            "full_name": persona["name"],
+            "phone": persona["phone"],
+            "role": UserRole.TECHNICIAN,
+            "building_id": buildings[0].id,
+            "speciality": persona["speciality"],
+            "is_active": True,
+            "is_verified": True
+        })
+        created.append(f"  - Technician: {persona['email']} / Tech@123")
     
     # Create residents
     occupied_units = [u for u in units if u.is_occupied]
@@ -623,100 +642,116 @@ async def create_users(db: AsyncSession, buildings: list, units: list) -> dict:
     for i, persona in enumerate(PERSONAS["residents"]):
         if i < len(occupied_units):
             unit = occupied_units[i]
-            resident = User(
-                email=persona["email"],
-                hashed_password=hash_password("User@123"),
-                full_name=persona["name"],
-                phone=persona["phone"],
-                role=UserRole.RESIDENT,
-                building_id=unit.building_id,
-                unit_id=unit.id,
-                is_active=True,
-                is_verified=True
-            )
-            db.add(resident)
-            users["residents"].append(resident)
-            print(f"  - Resident: {persona['email']} / User@123 (Unit {unit.unit_number})")
-    
-    await db.flush()
+            rows.append({
+                "email": persona["email"],
+                "hashed_password": password_hashes["User@123"],
+                "full_name": persona["name"],
+                "phone": persona["phone"],
+                "role": UserRole.RESIDENT,
+                "building_id": unit.building_id,
+                "unit_id": unit.id,
+                "is_active": True,
+                "is_verified": True
+            })
+            created.append(f"  - Resident: {persona['email']} / User@123 (Unit {unit.unit_number})")
+    
+    # Printed once for the whole step rather than per row
+    print("\n".join(created))
+    
+    users = {"residents": [], "technicians": [], "admins": []}
+    groups = {
+        UserRole.RESIDENT: users["residents"],
+        UserRole.TECHNICIAN: users["technicians"],
+        UserRole.BUILDING_ADMIN: users["admins"]
+    }
+    for user in await insert_returning(db, User, rows, User.id, User.role, User.unit_id):
+        group = groups.get(user.role)
+        if group is not None:
+            group.append(user)
+    
     return users
 
 
 async def create_vendors(db: AsyncSession) -> list:
     """Create sample vendors"""
-    vendors = []
+    rows = []
+    created = []
     
     for persona in PERSONAS["vendors"]:
-        vendor = Vendor(
-            name=persona["name"],
-            company_name=persona["company"],
-            email=persona["email"],
-            phone=persona["phone"],
-            service_type=persona["service"],
-            rating=round(random.uniform(3.5, 5.0), 1),
-            total_jobs=random.randint(10, 100),
-            completed_jobs=random.randint(8, 95),
-            is_verified=random.random() > 0.2,
-            is_active=True
-        )
-        db.add(vendor)
-        vendors.append(vendor)
-        print(f"  - Vendor: {persona['company']} ({persona['service']})")
-    
-    await db.flush()
-    return vendors
+        rows.append({
+            "name": persona["name"],
+            "company_name": persona["company"],
+            "email": persona["email"],
+            "phone": persona["phone"],
+            "service_type": persona["service"],
+            "rating": round(random.uniform(3.5, 5.0), 1),
+            "total_jobs": random.randint(10, 100),
+            "completed_jobs": random.randint(8, 95),
+            "is_verified": random.random() > 0.2,
+            "is_active": True
+        })
+        created.append(f"  - Vendor: {persona['company']} ({persona['service']})")
+    
+    print("\n".join(created))
+    return await insert_returning(db, Vendor, rows, Vendor.id)
 
 
 async def create_facilities(db: AsyncSession, buildings: list) -> list:
     """Create sample facilities"""
-    facilities = []
+    rows = [
+        {
+            "building_id": building.id,
+            **fac_data,
+            "advance_booking_days": 30,
+            "is_active": True
+        }
+        for building in buildings
+        for fac_data in SAMPLE_FACILITIES
+    ]
     
-    for building in buildings:
-        for fac_data in SAMPLE_FACILITIES:
-            facility = Facility(
-                building_id=building.id,
-                **fac_data,
-                advance_booking_days=30,
-                is_active=True
-            )
-            db.add(facility)
-            facilities.append(facility)
-    
-    await db.flush()
+    facilities = await insert_returning(
+        db, Facility, rows,
+        Facility.id, Facility.booking_fee, Facility.deposit_required
+    )
     print(f"  - Created {len(facilities)} facilities")
     return facilities
 
 
 async def create_announcements(db: AsyncSession, buildings: list):
     """Create sample announcements"""
+    rows = []
+    now = datetime.utcnow()
     for building in buildings:
         for ann_data in SAMPLE_ANNOUNCEMENTS:
-            days_ago = random.randint(1, 30)
-            announcement = Announcement(
-                building_id=building.id,
-                title=ann_data["title"],
-                content=ann_data["content"],
-                target_audience=json.dumps(["all"]),
-                send_push=True,
-                send_email=True,
-                is_published=True,
-                published_at=datetime.utcnow() - timedelta(days=days_ago),
-                created_at=datetime.utcnow() - timedelta(days=days_ago)
-            )
-            db.add(announcement)
-    
-    await db.flush()
+            posted_at = now - timedelta(days=random.randint(1, 30))
+            rows.append({
+                "building_id": building.id,
+                "title": ann_data["title"],
+                "content": ann_data["content"],
+                "target_audience": ["all"],
+                "send_push": True,
+                "send_email": True,
+                "is_published": True,
+                "published_at": posted_at,
+                "created_at": posted_at
+            })
+    
+    await db.execute(insert(Announcement), rows)
     print(f"  - Created {len(SAMPLE_ANNOUNCEMENTS) * len(buildings)} announcements")
 
 
 async def create_complaints(db: AsyncSession, buildings: list, units: list, users: dict) -> list:
     """Create sample complaints with various statuses"""
-    complaints = []
+    rows = []
     statuses = list(ComplaintStatus)
+    now = datetime.utcnow()
+    
+    units_by_id = {u.id: u for u in units}
+    residents, technicians = users["residents"], users["technicians"]
     
     # Get the first resident (demo user: ahmad.hassan@gmail.com) for guaranteed data
-    demo_resident = users["residents"][0]
-    demo_unit = next((u for u in units if u.id == demo_resident.unit_id), units[0])
+    demo_resident = residents[0]
+    demo_unit = units_by_id.get(demo_resident.unit_id, units[0])
     
     for i, comp_data in enumerate(SAMPLE_COMPLAINTS):
         # First 5 complaints go to demo user with specific statuses
@@ -736,116 +771,117 @@ async def create_complaints(db: AsyncSession, buildings: list, units: list, user
                 status = ComplaintStatus.CLOSED
         else:
             # Rest go to random residents
-            resident = random.choice(users["residents"])
-            resident_units = [u for u in units if u.id == resident.unit_id]
-            unit = resident_units[0] if resident_units else random.choice(units)
+            resident = random.choice(residents)
+            unit = units_by_id.get(resident.unit_id) or random.choice(units)
             status = random.choice(statuses)
         
         # Calculate dates
         days_ago = random.randint(1, 45)
-        created_at = datetime.utcnow() - timedelta(days=days_ago)
+        created_at = now - timedelta(days=days_ago)
         
         # SLA calculation
         sla_hours = get_sla_hours(comp_data["priority"])
-        sla_deadline = calculate_sla_deadline(created_at, comp_data["priority"])
-        is_breached = status not in [ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED] and sla_deadline < datetime.utcnow()
         
         # Assign technician for in-progress complaints
         assigned_to = None
         if status in [ComplaintStatus.ASSIGNED, ComplaintStatus.IN_PROGRESS, ComplaintStatus.COMPLETED]:
-            assigned_to = random.choice(users["technicians"])
+            assigned_to = random.choice(technicians)
         
-        complaint = Complaint(
-            building_id=unit.building_id,
-            unit_id=unit.id,
-            title=comp_data["title"],
-            description=comp_data["description"],
-            category=comp_data["category"],
-            priority=comp_data["priority"],
-            status=status,
-            created_by_id=resident.id,
-            assigned_to_id=assigned_to.id if assigned_to else None,
-            sla_hours=sla_hours,
-            sla_deadline=sla_deadline,
-            is_sla_breached=is_breached,
-            created_at=created_at,
-            updated_at=created_at + timedelta(hours=random.randint(1, 48)),
-            resolved_at=created_at + timedelta(hours=random.randint(24, 72)) if status in [ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED] else None,
-            estimated_cost=random.choice([0, 50, 100, 200, 500, 1000]),
-            actual_cost=random.choice([0, 45, 95, 180, 450, 950]) if status == ComplaintStatus.COMPLETED else 0
-        )
-        db.add(complaint)
-        complaints.append(complaint)
-    
-    await db.flush()
-    
-    # Create timeline updates for each complaint
-    for complaint in complaints:
-        await create_complaint_timeline(db, complaint, users)
+        rows.append({
+            "building_id": unit.building_id,
+            "unit_id": unit.id,
+            "title": comp_data["title"],
+            "description": comp_data["description"],
+            "category": comp_data["category"],
+            "priority": comp_data["priority"],
+            "status": status,
+            "created_by_id": resident.id,
+            "assigned_to_id": assigned_to.id if assigned_to else None,
+            "sla_hours": sla_hours,
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(hours=random.randint(1, 48)),
+            "resolved_at": created_at + timedelta(hours=random.randint(24, 72)) if status in [ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED] else None,
+            "estimated_cost": random.choice([0, 50, 100, 200, 500, 1000]),
+            "actual_cost": random.choice([0, 45, 95, 180, 450, 950]) if status == ComplaintStatus.COMPLETED else 0
+        })
+    
+    complaints = await insert_returning(
+        db, Complaint, rows,
+        Complaint.id, Complaint.title, Complaint.priority, Complaint.status,
+        Complaint.created_by_id, Complaint.assigned_to_id, Complaint.sla_hours,
+        Complaint.created_at, Complaint.resolved_at, Complaint.actual_cost
+    )
+    
+    # Create timeline updates for all complaints in one batch
+    updates = [
+        update
+        for complaint in complaints
+        for update in complaint_timeline_rows(complaint, users)
+    ]
+    await db.execute(insert(ComplaintUpdate), updates)
     
     print(f"  - Created {len(complaints)} complaints with timelines")
     return complaints
 
 
-async def create_complaint_timeline(db: AsyncSession, complaint: Complaint, users: dict):
-    """Create timeline updates for a complaint"""
+def complaint_timeline_rows(complaint: Row, users: dict) -> list:
+    """Build the timeline update rows for a complaint"""
     updates = []
     
     # Submitted update
-    updates.append(ComplaintUpdate(
-        complaint_id=complaint.id,
-        created_by_id=complaint.created_by_id,
-        status=ComplaintStatus.SUBMITTED,
-        message="Complaint submitted successfully. Management has been notified.",
-        created_at=complaint.created_at
-    ))
+    updates.append({
+        "complaint_id": complaint.id,
+        "created_by_id": complaint.created_by_id,
+        "status": ComplaintStatus.SUBMITTED,
+        "message": "Complaint submitted successfully. Management has been notified.",
+        "created_at": complaint.created_at
+    })
     
     if complaint.status in [ComplaintStatus.REVIEWING, ComplaintStatus.ASSIGNED, 
                             ComplaintStatus.IN_PROGRESS, ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED]:
-        updates.append(ComplaintUpdate(
-            complaint_id=complaint.id,
-            created_by_id=users["admins"][0].id,
-            status=ComplaintStatus.REVIEWING,
-            message="Complaint is being reviewed by management.",
-            created_at=complaint.created_at + timedelta(hours=2)
-        ))
+        updates.append({
+            "complaint_id": complaint.id,
+            "created_by_id": users["admins"][0].id,
+            "status": ComplaintStatus.REVIEWING,
+            "message": "Complaint is being reviewed by management.",
+            "created_at": complaint.created_at + timedelta(hours=2)
+        })
     
     if complaint.status in [ComplaintStatus.ASSIGNED, ComplaintStatus.IN_PROGRESS, 
                             ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED]:
-        updates.append(ComplaintUpdate(
-            complaint_id=complaint.id,
-            created_by_id=users["admins"][0].id,
-            status=ComplaintStatus.ASSIGNED,
-            message=f"Job assigned to technician. Expected resolution within {complaint.sla_hours} hours.",
-            created_at=complaint.created_at + timedelta(hours=4)
-        ))
+        updates.append({
+            "complaint_id": complaint.id,
+            "created_by_id": users["admins"][0].id,
+            "status": ComplaintStatus.ASSIGNED,
+            "message": f"Job assigned to technician. Expected resolution within {complaint.sla_hours} hours.",
+            "created_at": complaint.created_at + timedelta(hours=4)
+        })
     
     if complaint.status in [ComplaintStatus.IN_PROGRESS, ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED] and complaint.assigned_to_id:
-        updates.append(ComplaintUpdate(
-            complaint_id=complaint.id,
-            created_by_id=complaint.assigned_to_id,
-            status=ComplaintStatus.IN_PROGRESS,
-            message="Technician is on-site and working on the issue.",
-            created_at=complaint.created_at + timedelta(hours=8)
-        ))
+        updates.append({
+            "complaint_id": complaint.id,
+            "created_by_id": complaint.assigned_to_id,
+            "status": ComplaintStatus.IN_PROGRESS,
+            "message": "Technician is on-site and working on the issue.",
+            "created_at": complaint.created_at + timedelta(hours=8)
+        })
     
     if complaint.status in [ComplaintStatus.COMPLETED, ComplaintStatus.CLOSED] and complaint.assigned_to_id:
-        updates.append(ComplaintUpdate(
-            complaint_id=complaint.id,
-            created_by_id=complaint.assigned_to_id,
-            status=ComplaintStatus.COMPLETED,
-            message="Issue has been resolved. Please confirm if everything is working properly.",
-            cost_update=complaint.actual_cost,
-            created_at=complaint.resolved_at
-        ))
+        updates.append({
+            "complaint_id": complaint.id,
+            "created_by_id": complaint.assigned_to_id,
+            "status": ComplaintStatus.COMPLETED,
+            "message": "Issue has been resolved. Please confirm if everything is working properly.",
+            "cost_update": complaint.actual_cost,
+            "created_at": complaint.resolved_at
+        })
     
-    for update in updates:
-        db.add(update)
+    return updates
 
 
 async def create_vendor_quotes(db: AsyncSession, complaints: list, vendors: list):
     """Create vendor quotes for some complaints"""
-    quote_count = 0
+    rows = []
     
     for complaint in complaints:
         if complaint.priority in [ComplaintPriority.HIGH, ComplaintPriority.CRITICAL]:
@@ -853,50 +889,48 @@ async def create_vendor_quotes(db: AsyncSession, complaints: list, vendors: list
             relevant_vendors = vendors[:3]  # Take first 3 vendors
             
             for vendor in relevant_vendors:
-                quote = VendorQuote(
-                    complaint_id=complaint.id,
-                    vendor_id=vendor.id,
-                    amount=round(random.uniform(100, 2000), 2),
-                    currency="MYR",
-                    description=f"Quote for {complaint.title}. Includes parts and labor.",
-                    estimated_days=random.randint(1, 7),
-                    status=random.choice([VendorQuoteStatus.SUBMITTED, VendorQuoteStatus.UNDER_REVIEW, VendorQuoteStatus.APPROVED])
-                )
-                db.add(quote)
-                quote_count += 1
-    
-    await db.flush()
-    print(f"  - Created {quote_count} vendor quotes")
+                rows.append({
+                    "complaint_id": complaint.id,
+                    "vendor_id": vendor.id,
+                    "amount": round(random.uniform(100, 2000), 2),
+                    "currency": "MYR",
+                    "description": f"Quote for {complaint.title}. Includes parts and labor.",
+                    "estimated_days": random.randint(1, 7),
+                    "status": random.choice([VendorQuoteStatus.SUBMITTED, VendorQuoteStatus.UNDER_REVIEW, VendorQuoteStatus.APPROVED])
+                })
+    
+    if rows:
+        await db.execute(insert(VendorQuote), rows)
+    print(f"  - Created {len(rows)} vendor quotes")
 
 
 async def create_bookings(db: AsyncSession, facilities: list, users: dict):
     """Create sample facility bookings"""
-    booking_count = 0
+    rows = []
+    now = datetime.utcnow()
     
     for facility in facilities[:5]:  # First 5 facilities
         for _ in range(3):  # 3 bookings each
             resident = random.choice(users["residents"])
-            booking_date = datetime.utcnow() + timedelta(days=random.randint(1, 14))
+            booking_date = now + timedelta(days=random.randint(1, 14))
             start_hour = random.randint(9, 18)
             
-            booking = FacilityBooking(
-                facility_id=facility.id,
-                user_id=resident.id,
-                booking_date=booking_date,
-                start_time=booking_date.replace(hour=start_hour, minute=0),
-                end_time=booking_date.replace(hour=start_hour + 2, minute=0),
-                number_of_guests=random.randint(1, 10),
-                purpose="Family gathering" if facility.booking_fee > 0 else None,
-                total_fee=facility.booking_fee * 2,
-                deposit_paid=facility.deposit_required,
-                is_paid=random.random() > 0.3,
-                status=random.choice([BookingStatus.PENDING, BookingStatus.CONFIRMED])
-            )
-            db.add(booking)
-            booking_count += 1
-    
-    await db.flush()
-    print(f"  - Created {booking_count} facility bookings")
+            rows.append({
+                "facility_id": facility.id,
+                "user_id": resident.id,
+                "booking_date": booking_date,
+                "start_time": booking_date.replace(hour=start_hour, minute=0),
+                "end_time": booking_date.replace(hour=start_hour + 2, minute=0),
+                "number_of_guests": random.randint(1, 10),
+                "purpose": "Family gathering" if facility.booking_fee > 0 else None,
+                "total_fee": facility.booking_fee * 2,
+                "deposit_paid": facility.deposit_required,
+                "is_paid": random.random() > 0.3,
+                "status": random.choice([BookingStatus.PENDING, BookingStatus.CONFIRMED])
+            })
+    
+    await db.execute(insert(FacilityBooking), rows)
+    print(f"  - Created {len(rows)} facility bookings")
 
 
 def print_summary():
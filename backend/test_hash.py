@@ -1,10 +1,48 @@
+import asyncio
+import statistics
+import time
+
+from app.config import settings
 from app.services.auth import hash_password, verify_password
 
-try:
+ROUNDS = 20
+WARMUP = 2
+
+
+async def timed(func, *args):
+    """Latency samples (ms) of sequential calls, after a warm-up"""
+    for _ in range(WARMUP):
+        await func(*args)
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def throughput(func, *args):
+    """Calls per second with ROUNDS calls in flight on the password pool"""
+    start = time.perf_counter()
+    await asyncio.gather(*(func(*args) for _ in range(ROUNDS)))
+    return ROUNDS / (time.perf_counter() - start)
+
+
+def report(name, samples, per_second):
+    p50 = statistics.median(samples)
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    print(f"{name:<7} p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   {per_second:7.1f}/s concurrent")
+
+
+async def main():
     pwd = "Admin@123"
-    hashed = hash_password(pwd)
-    print(f"Hash success: {hashed}")
-    verified = verify_password(pwd, hashed)
-    print(f"Verify success: {verified}")
-except Exception as e:
-    print(f"Error: {e}")
+    hashed = await hash_password(pwd)
+    assert await verify_password(pwd, hashed), "verify failed for a fresh hash"
+    
+    print(f"bcrypt cost {settings.BCRYPT_ROUNDS}, {ROUNDS} calls each")
+    report("hash", await timed(hash_password, pwd), await throughput(hash_password, pwd))
+    report("verify", await timed(verify_password, pwd, hashed), await throughput(verify_password, pwd, hashed))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
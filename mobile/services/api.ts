@@ -343,10 +343,12 @@ export interface ComplaintStats {
 
 export interface PaginatedResponse<T> {
     items: T[];
-    total: number;
+    total: number | null;
     page: number;
     page_size: number;
-    total_pages: number;
+    total_pages: number | null;
+    has_next?: boolean | null;
+    next_cursor?: string | null;
 }
 
 // ============================================